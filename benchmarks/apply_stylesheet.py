@@ -0,0 +1,67 @@
+""" Compare switching the stylesheet of a large layout by rebuilding the
+widget and by apply_stylesheet
+
+usage:
+    python benchmarks/apply_stylesheet.py [rows]
+"""
+
+import sys
+import time
+from tkinter import Tk
+
+from jinja2 import DictLoader
+
+from tkouter import TkOutWidget
+
+
+LAYOUT = """
+<html>
+    <head><link rel="stylesheet" type="text/css" href="{{ css }}" /></head>
+    <body>
+        {% for i in range(rows) %}
+        <left class="row">
+            <label class="title" width="10"> row {{ i }} </label>
+            <entry width="20" />
+            <button class="btn" width="8"> ok </button>
+        </left>
+        {% endfor %}
+    </body>
+</html>"""
+
+LIGHT = ".title { background: white; foreground: black; } .btn { background: #eeeeee; }"
+DARK = ".title { background: black; foreground: white; } .btn { background: #333333; }"
+
+
+class Themed(TkOutWidget):
+    layout = 'themed.html'
+    loader = DictLoader({'themed.html': LAYOUT, 'light.css': LIGHT, 'dark.css': DARK})
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    root = Tk()
+
+    Themed.context = {'rows': rows, 'css': 'light.css'}
+    widget = Themed(root)
+    widget.pack()
+    root.update()
+
+    start = time.perf_counter()
+    widget.destroy()
+    Themed.context = {'rows': rows, 'css': 'dark.css'}
+    widget = Themed(root)
+    widget.pack()
+    root.update()
+    print('rebuild          {:8.3f} s'.format(time.perf_counter() - start))
+
+    for css in [LIGHT, DARK]:
+        start = time.perf_counter()
+        configured = widget.apply_stylesheet(css)
+        root.update()
+        print('apply_stylesheet {:8.3f} s  {} widgets configured'.format(
+            time.perf_counter() - start, configured))
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
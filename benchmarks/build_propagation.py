@@ -0,0 +1,59 @@
+""" Compare building a deep layout with and without suspending geometry
+propagation
+
+usage:
+    python benchmarks/build_propagation.py [depth] [labels]
+
+The layout nests depth containers, each holding some labels. Time includes
+the geometry pass done by update_idletasks after the widget is built.
+"""
+
+import sys
+import time
+from tkinter import Tk
+
+from tkouter import TkOutWidget
+
+
+LAYOUT = """
+<html>
+    <body>
+        {% for d in range(depth) %}
+        <{{ 'left' if d % 2 else 'top' }}>
+            {% for i in range(labels) %}<label> {{ d }}-{{ i }} </label>{% endfor %}
+        {% endfor %}
+        {% for d in range(depth) | reverse %}
+        </{{ 'left' if d % 2 else 'top' }}>
+        {% endfor %}
+    </body>
+</html>"""
+
+
+class Suspended(TkOutWidget):
+    layout = LAYOUT
+    suspend_propagation = True
+
+
+class Propagating(Suspended):
+    suspend_propagation = False
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    labels = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    root = Tk()
+    for widget_cls in [Propagating, Suspended]:
+        widget_cls.context = {'depth': depth, 'labels': labels}
+        start = time.perf_counter()
+        w = widget_cls(root)
+        w.pack()
+        root.update_idletasks()
+        elapsed = time.perf_counter() - start
+        print('{:11} depth {} x {} labels: {:.3f} s'.format(widget_cls.__name__, depth, labels, elapsed))
+        w.destroy()
+        root.update_idletasks()
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
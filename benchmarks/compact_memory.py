@@ -0,0 +1,74 @@
+""" Compare the memory kept by tkouter widgets with and without compact mode
+
+usage:
+    python benchmarks/compact_memory.py [instances]
+
+Python allocations are measured by tracemalloc, the memory of libxml2 (the
+lxml tree) is only visible in the resident set size of the process.
+"""
+
+import gc
+import sys
+import tracemalloc
+from tkinter import Tk
+
+from tkouter import TkOutWidget
+
+
+ROWS = 50
+
+LAYOUT = """
+<html>
+    <body>
+        {% for i in range(rows) %}
+        <left class="row">
+            <label class="title" width="10"> row {{ i }} </label>
+            <entry width="20" />
+            <button class="btn" width="8"> ok </button>
+        </left>
+        {% endfor %}
+    </body>
+</html>"""
+
+
+class Normal(TkOutWidget):
+    layout = LAYOUT
+    context = {'rows': ROWS}
+
+
+class Compact(Normal):
+    compact = True
+
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * 4096
+
+
+def measure(widget_cls, root, instances):
+    gc.collect()
+    tracemalloc.start()
+    rss_before = rss()
+    widgets = [widget_cls(root) for _ in range(instances)]
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = rss()
+    for w in widgets:
+        w.destroy()
+    return traced, rss_after - rss_before
+
+
+def main():
+    instances = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    root = Tk()
+    for widget_cls in [Normal, Compact]:
+        traced, grown = measure(widget_cls, root, instances)
+        msg = '{:8} {} instances: python {:8.1f} KiB/instance, rss {:8.1f} KiB/instance'
+        print(msg.format(widget_cls.__name__, instances,
+                         traced / instances / 1024, grown / instances / 1024))
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+""" Compare building a large uniform layout with css class rules and
+per-element css rules
+
+usage:
+    python benchmarks/css_class_rules.py [buttons]
+
+A rule with a bare tag selector like "button" is compiled into the tk option
+database, while "left > button" is copied into every matching element.
+"""
+
+import sys
+import time
+from tkinter import Tk
+
+from jinja2 import DictLoader
+
+from tkouter import TkOutWidget
+
+
+LAYOUT = """
+<html>
+    <head><link rel="stylesheet" type="text/css" href="{{ css }}" /></head>
+    <body>
+        <left>
+        {% for i in range(buttons) %}
+            <button> {{ i }} </button>
+        {% endfor %}
+        </left>
+    </body>
+</html>"""
+
+DECLARATIONS = "{ width: 8; background: white; foreground: black; relief: groove; padx: 2; }"
+
+
+class ClassRules(TkOutWidget):
+    layout = 'layout.html'
+    loader = DictLoader({
+        'layout.html': LAYOUT,
+        'class.css': 'button ' + DECLARATIONS,
+        'element.css': 'left > button ' + DECLARATIONS,
+    })
+    context = {'css': 'class.css'}
+
+
+class ElementRules(ClassRules):
+    context = {'css': 'element.css'}
+
+
+def main():
+    buttons = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    root = Tk()
+    for widget_cls in [ElementRules, ClassRules]:
+        widget_cls.context = dict(widget_cls.context, buttons=buttons)
+        start = time.perf_counter()
+        w = widget_cls(root)
+        elapsed = time.perf_counter() - start
+        print('{:13} {} buttons: {:.3f} s'.format(widget_cls.__name__, buttons, elapsed))
+        w.destroy()
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+""" Compare building many tkouter widget classes with and without preload
+
+usage:
+    python benchmarks/preload.py [classes] [workers]
+
+Each class has its own layout, so nothing is shared between them. Time of
+preload includes starting the process pool.
+"""
+
+import sys
+import time
+from tkinter import Tk
+
+from jinja2 import DictLoader
+
+from tkouter import TkOutWidget, preload
+
+
+LAYOUT = """
+<html>
+    <head><link rel="stylesheet" type="text/css" href="form.css" /></head>
+    <body>
+        {% for i in range(rows) %}
+        <top>
+            <label> field {{ n }}-{{ i }} </label>
+            <entry width="20" pack-side="right" />
+        </top>
+        {% endfor %}
+    </body>
+</html>"""
+
+CSS = "top > label { width: 12; anchor: w; } top > entry { relief: groove; }"
+
+
+def make_classes(count):
+    loader = DictLoader({'form.html': LAYOUT, 'form.css': CSS})
+    return [type('Form{}'.format(n), (TkOutWidget,), {
+        'layout': 'form.html',
+        'loader': loader,
+        'context': {'n': n, 'rows': 100},
+        '__module__': __name__,
+    }) for n in range(count)]
+
+
+def build(root, classes):
+    start = time.perf_counter()
+    for widget_cls in classes:
+        widget_cls(root).destroy()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    root = Tk()
+    print('serial:  {:.3f} s'.format(build(root, make_classes(count))))
+    classes = make_classes(count)
+    globals().update((cls.__name__, cls) for cls in classes)
+    start = time.perf_counter()
+    preload(classes, workers=workers)
+    elapsed = time.perf_counter() - start
+    print('preload: {:.3f} s + build {:.3f} s'.format(elapsed, build(root, classes)))
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+""" Build and destroy a tkouter widget many times and check that the tcl
+interpreter and python memory stay flat
+
+usage:
+    python benchmarks/soak_destroy.py [cycles]
+
+The layout binds commands, fields, menus and a <for> tag, which all allocate
+interpreter state. It exits with an error if the tcl command count or the
+traced python memory keeps growing after the warm up cycles.
+The layout is preloaded, python compiling the same template source thousands
+of times grows its own caches once, which is not a leak of tkouter.
+"""
+
+import gc
+import sys
+import tracemalloc
+from tkinter import Tk
+
+from tkouter import TkOutWidget, StringField, preload
+
+
+LAYOUT = """
+<html>
+    <head>
+        <menu>
+            <menu label="File">
+                <command command="{self.noop}"> Open </command>
+            </menu>
+            <menu label="Recent" source="{self.recent}" command="{self.open}" />
+        </menu>
+    </head>
+    <body>
+        <entry textvariable="{self.text.var}" />
+        <for each="{self.rows}">
+            <button command="{self.noop}" text="{item}" />
+        </for>
+    </body>
+</html>"""
+
+WARMUP = 100
+# memory of the python objects which are cached once, like lxml proxies of
+# the tags and compiled css selectors, is not a leak
+TOLERANCE = 256 * 1024
+
+
+class Page(TkOutWidget):
+    layout = LAYOUT
+    text = StringField(default='text')
+
+    def __init__(self, parent):
+        self.rows = list(range(10))
+        self.recent = ['a', 'b', 'c']
+        super().__init__(parent)
+
+    def noop(self):
+        pass
+
+    def open(self, entry):
+        pass
+
+
+def measure(root):
+    gc.collect()
+    return len(root.tk.call('info', 'commands')), tracemalloc.get_traced_memory()[0]
+
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    preload([Page], workers=1)
+    root = Tk()
+    tracemalloc.start()
+    baseline = None
+    for i in range(1, cycles + 1):
+        page = Page(root)
+        page.pack()
+        root.update()
+        page.destroy()
+        if i == WARMUP:
+            baseline = measure(root)
+        if i % 1000 == 0 or i == cycles:
+            commands, memory = measure(root)
+            print('{:6} cycles: {} tcl commands, {:.1f} KiB traced'.format(i, commands, memory / 1024))
+    root.destroy()
+    if baseline is not None:
+        assert commands == baseline[0], 'tcl commands grew from {} to {}'.format(baseline[0], commands)
+        growth = memory - baseline[1]
+        assert growth < TOLERANCE, 'python memory grew by {:.1f} KiB'.format(growth / 1024)
+        print('flat after {} cycles'.format(cycles))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+""" Compare the peak memory of parsing a large generated layout by rendering
+the whole text first and by streaming rendered chunks into the parser
+
+usage:
+    python benchmarks/stream_compile.py [rows]
+
+Only python allocations are measured by tracemalloc, the lxml tree itself
+lives in libxml2 and is the same in both cases.
+"""
+
+from io import StringIO
+import sys
+import time
+import tracemalloc
+
+from jinja2 import Template
+from lxml import etree
+
+from tkouter.core import _make_parser, _parse_template
+
+
+LAYOUT = """
+<html>
+    <body>
+        {% for i in range(rows) %}
+        <left class="row">
+            <label class="title" width="10"> row {{ i }} with a longer description </label>
+            <entry width="20" />
+            <button class="btn" width="8"> ok </button>
+        </left>
+        {% endfor %}
+    </body>
+</html>"""
+
+
+def rendered(template, context):
+    html = template.render(context)
+    return etree.parse(StringIO(html), _make_parser())
+
+
+def measure(func, context):
+    template = Template(LAYOUT)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(template, context)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    context = {'rows': int(sys.argv[1]) if len(sys.argv) > 1 else 20000}
+    for name, func in [('render then parse', rendered), ('streaming parse', _parse_template)]:
+        elapsed, peak = measure(func, context)
+        print('{:<20} {:8.3f} s  peak {:8.1f} MB'.format(name, elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+from tkinter import TclError
+import unittest
+
+from tkouter.bindings import *
+from tkouter.dispatch import Dispatcher
+from tkouter.errors import OptionError
+
+
+class FakeEvent:
+
+    def __init__(self, widget, n):
+        self.widget = widget
+        self.n = n
+
+    def __repr__(self):
+        return '{}{}'.format(self.widget, self.n)
+
+
+class FakeTk:
+
+    def call(self, *args):
+        if args[0] == 'bind' and args[2] == '<Bogus>':
+            raise TclError('bad event type or keysym "Bogus"')
+
+
+class FakeWidget:
+
+    def __init__(self):
+        self.tk = FakeTk()
+        self.timers = {}
+        self.timer_ids = 0
+        self.tags = ('.w', 'Entry', '.', 'all')
+        self.bound = {}
+        self.commands = []
+        self.dispatcher = Dispatcher(self)
+
+    def register(self, func):
+        return 'dispatch'
+
+    def after(self, ms, func, *args):
+        after_id = 'after#{}'.format(self.timer_ids)
+        self.timer_ids += 1
+        self.timers[after_id] = (func, args)
+        return after_id
+
+    def after_cancel(self, after_id):
+        del self.timers[after_id]
+
+    def run_timers(self):
+        timers, self.timers = self.timers, {}
+        for func, args in timers.values():
+            func(*args)
+
+    def winfo_class(self):
+        return 'TkOutFake0'
+
+    def bind_class(self, tag, sequence, func):
+        self.bound[tag, sequence] = func
+        self.commands.append(tag)
+        return tag
+
+    def unbind_class(self, tag, sequence):
+        del self.bound[tag, sequence]
+
+    def deletecommand(self, name):
+        self.commands.remove(name)
+
+    def bindtags(self, tags=None):
+        if tags is None:
+            return self.tags
+        self.tags = tags
+
+
+class TestBindings(unittest.TestCase):
+
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.events = []
+
+    def handler(self, event):
+        self.events.append(event)
+
+    def test_parse(self):
+        self.assertEqual(parse_binding('Button-1'), ('<Button-1>', None, None))
+        self.assertEqual(parse_binding('KeyRelease.debounce-200'), ('<KeyRelease>', 'debounce', 200))
+        self.assertRaises(ValueError, parse_binding, 'Motion.slow-3')
+
+    def test_debounce(self):
+        debounce = Debounce(self.widget, self.handler, 200)
+        for event in range(3):
+            debounce(event)
+        self.assertEqual(len(self.widget.timers), 1)
+        self.widget.run_timers()
+        self.assertEqual(self.events, [2])
+
+    def test_debounce_per_widget(self):
+        debounce = Debounce(self.widget, self.handler, 200)
+        events = [FakeEvent(w, n) for n in range(2) for w in 'ab']
+        for event in events:
+            debounce(event)
+        self.assertEqual(len(self.widget.timers), 2)
+        self.widget.run_timers()
+        self.assertEqual(self.events, events[2:])
+        debounce(events[0])
+        debounce.cancel()
+        self.assertEqual(self.widget.timers, {})
+
+    def test_throttle(self):
+        throttle = Throttle(self.widget, self.handler, 50)
+        for event in range(3):
+            throttle(event)
+        self.assertEqual(self.events, [0])
+        self.widget.run_timers()
+        self.assertEqual(self.events, [0, 2])
+        self.widget.run_timers()
+        self.assertEqual(self.events, [0, 2])
+
+    def test_throttle_per_widget(self):
+        throttle = Throttle(self.widget, self.handler, 50)
+        events = [FakeEvent(w, n) for n in range(3) for w in 'ab']
+        for event in events:
+            throttle(event)
+        self.assertEqual(self.events, events[:2])
+        self.widget.run_timers()
+        self.assertEqual(self.events, events[:2] + events[4:])
+
+    def test_bad_sequence(self):
+        bindings = Bindings(self.widget)
+        self.assertRaises(OptionError, bindings.bind, FakeWidget(), 'Bogus', self.handler)
+        self.assertEqual(len(bindings), 0)
+        self.assertEqual(self.widget.commands, [])
+
+    def test_collapse(self):
+        bindings = Bindings(self.widget)
+        widgets = [FakeWidget() for _ in range(3)]
+        tags = [bindings.bind(w, 'Motion.throttle-50', self.handler) for w in widgets]
+        self.assertEqual(len(set(tags)), 1)
+        self.assertEqual(len(bindings), 1)
+        self.assertEqual(widgets[0].tags[1], tags[0])
+        for tag in tags:
+            bindings.release(tag)
+        self.assertEqual(len(bindings), 0)
+        self.assertEqual(self.widget.bound, {})
+        self.assertEqual(self.widget.commands, [])
+        self.assertEqual(len(self.widget.dispatcher), 0)
+
+    def test_profiled(self):
+        bindings = Bindings(self.widget)
+        self.widget.dispatcher.enable_profiling()
+        tag = bindings.bind(FakeWidget(), 'Motion.throttle-50', self.handler, 'canvas')
+        throttle = self.widget.bound[tag, '<Motion>']
+        for event in range(3):
+            throttle(event)
+        self.widget.run_timers()
+        # the first and the final call of the throttle are timed
+        self.assertEqual(self.events, [0, 2])
+        report = self.widget.dispatcher.report()
+        self.assertEqual(len(report), 1)
+        self.assertEqual((report[0]['calls'], report[0]['sources']), (2, ['canvas']))
@@ -0,0 +1,124 @@
+import time
+import unittest
+
+from tkouter.dispatch import Dispatcher, Histogram
+
+
+class FakeWidget:
+
+    def register(self, func):
+        return 'dispatch'
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = Dispatcher(FakeWidget())
+        self.calls = []
+
+    def handler(self, *args):
+        self.calls.append(args)
+        return len(args)
+
+    def test_shared_id(self):
+        self.assertEqual(self.dispatcher.command(self.handler, 'button'), 'dispatch 0')
+        self.assertEqual(self.dispatcher.command(self.handler, 'ok'), 'dispatch 0')
+        self.assertEqual(len(self.dispatcher), 1)
+        self.assertEqual(self.dispatcher.sources[0], {'button', 'ok'})
+        self.assertEqual(self.dispatcher.dispatch('0', 'a', 'b'), 2)
+        self.assertEqual(self.calls, [('a', 'b')])
+
+    def test_release(self):
+        hid = self.dispatcher.add(self.handler)
+        other = self.dispatcher.add(print)
+        self.dispatcher.add(self.handler)
+        self.dispatcher.release(hid)
+        self.assertEqual(len(self.dispatcher), 2)
+        self.dispatcher.release(hid)
+        self.assertEqual(len(self.dispatcher), 1)
+        # the id is reused
+        self.assertEqual(self.dispatcher.add(len), hid)
+        self.assertEqual(self.dispatcher.add(print), other)
+
+
+class FakeTkWidget(FakeWidget):
+
+    def __init__(self):
+        self.events = []
+
+    def winfo_exists(self):
+        return True
+
+    def event_generate(self, sequence):
+        self.events.append(sequence)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.widget = FakeTkWidget()
+        self.dispatcher = Dispatcher(self.widget)
+
+    def fast(self):
+        pass
+
+    def slow(self):
+        time.sleep(0.02)
+
+    def test_histogram(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.add(ms / 1000)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 0.05, delta=0.05 * 0.2)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.099 * 0.2)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+    def test_disabled(self):
+        hid = self.dispatcher.add(self.fast)
+        self.dispatcher.dispatch(hid)
+        self.assertEqual(self.dispatcher.report(), [])
+
+    def test_report(self):
+        self.dispatcher.enable_profiling(slow=10)
+        fast = self.dispatcher.add(self.fast, 'ok')
+        slow = self.dispatcher.add(self.slow, 'load')
+        for _ in range(10):
+            self.dispatcher.dispatch(str(fast))
+        self.dispatcher.dispatch(str(slow))
+        report = self.dispatcher.report()
+        self.assertEqual([r['handler'] for r in report], ['TestProfiling.slow', 'TestProfiling.fast'])
+        self.assertEqual(report[0]['sources'], ['load'])
+        self.assertEqual((report[0]['calls'], report[0]['slow']), (1, 1))
+        self.assertEqual((report[1]['calls'], report[1]['slow']), (10, 0))
+        self.assertGreaterEqual(report[0]['p99'], 20)
+        self.assertEqual(self.widget.events, ['<<TkOutSlowHandler>>'])
+        self.assertEqual(self.dispatcher.slow_calls[-1][0], 'TestProfiling.slow')
+        self.assertIn('TestProfiling.fast', self.dispatcher.format_report())
+
+    def test_report_by_id(self):
+        self.dispatcher.enable_profiling()
+        first = self.dispatcher.add(lambda: None)
+        second = self.dispatcher.add(lambda: None)
+        self.dispatcher.dispatch(str(first))
+        self.dispatcher.dispatch(str(second))
+        # handlers with the same name are not merged
+        report = self.dispatcher.report()
+        self.assertEqual([r['handler'] for r in report], ['TestProfiling.test_report_by_id.<locals>.<lambda>'] * 2)
+        self.assertEqual(sorted(r['id'] for r in report), [first, second])
+        # a released id keeps its statistics apart from the next handler
+        self.dispatcher.release(first)
+        self.assertEqual(self.dispatcher.add(self.fast), first)
+        self.dispatcher.dispatch(str(first))
+        self.assertEqual(len(self.dispatcher.report()), 3)
+
+    def test_report_released_by_handler(self):
+        self.dispatcher.enable_profiling()
+
+        def remove():
+            self.dispatcher.release(hid)
+
+        hid = self.dispatcher.add(remove)
+        self.dispatcher.dispatch(str(hid))
+        self.assertEqual(self.dispatcher.stats, {})
+        self.assertEqual([r['calls'] for r in self.dispatcher.report()], [1])
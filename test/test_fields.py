@@ -0,0 +1,162 @@
+import tkinter
+from tkinter import Tcl, Tk
+import unittest
+
+from tkouter.fields import ComputedField, IntField, StringField
+
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.tcl = Tcl()
+
+    def validate(self, field, text, reason='key'):
+        command = field.validatecommand(self.tcl.tk)
+        for code, value in [('%W', '.e'), ('%v', 'all'), ('%V', reason), ('%P', '{%s}' % text)]:
+            command = command.replace(code, value)
+        return bool(int(self.tcl.eval(command)))
+
+    def test_string(self):
+        field = StringField(max_length=5, pattern='[a-z]*')
+        self.assertTrue(self.validate(field, 'abc'))
+        self.assertFalse(self.validate(field, 'abcdef'))
+        self.assertFalse(self.validate(field, 'ab1'))
+        self.assertEqual(field.clean('abcdefg'), 'abcde')
+        self.assertRaises(ValueError, field.clean, 'A')
+        self.assertEqual(StringField(max_length=None).clean('a' * 200), 'a' * 200)
+
+    def test_int(self):
+        field = IntField(min=10, max=99)
+        # partial input which can still become valid is accepted
+        self.assertTrue(self.validate(field, ''))
+        self.assertTrue(self.validate(field, '5'))
+        self.assertTrue(self.validate(field, '50'))
+        self.assertFalse(self.validate(field, '-'))
+        self.assertFalse(self.validate(field, '100'))
+        self.assertFalse(self.validate(field, '5a'))
+        self.assertEqual(field.clean(200), 99)
+        self.assertEqual(field.clean(1), 10)
+
+    def test_int_reachable(self):
+        field = IntField(min=10, max=20)
+        self.assertTrue(self.validate(field, '1'))
+        self.assertTrue(self.validate(field, '2'))
+        self.assertFalse(self.validate(field, '3'))
+        self.assertFalse(self.validate(field, '0'))
+        field = IntField(min=-20, max=-10)
+        self.assertTrue(self.validate(field, '-'))
+        self.assertTrue(self.validate(field, '-1'))
+        self.assertFalse(self.validate(field, '-3'))
+        self.assertFalse(self.validate(field, '1'))
+
+    def test_int_decimal(self):
+        field = IntField()
+        for text in ['0x1f', '010', '+5', ' 5', '5 ', '-0', '1e3']:
+            self.assertFalse(self.validate(field, text), text)
+        self.assertTrue(self.validate(field, '0'))
+        self.assertTrue(self.validate(field, '-15'))
+
+    def test_int_complete(self):
+        field = IntField(min=10, max=99)
+        # the whole range is checked when the entry loses focus or the variable changes
+        self.assertFalse(self.validate(field, '5', 'focusout'))
+        self.assertFalse(self.validate(field, '', 'focusout'))
+        self.assertTrue(self.validate(field, '50', 'focusout'))
+        self.assertFalse(self.validate(field, '100', 'forced'))
+        self.assertTrue(self.validate(field, '5', 'focusin'))
+
+    def test_negative(self):
+        field = IntField(min=-50)
+        self.assertTrue(self.validate(field, '-'))
+        self.assertTrue(self.validate(field, '-5'))
+        self.assertFalse(self.validate(field, '-51'))
+        self.assertTrue(self.validate(field, '1000'))
+
+
+class TestComputedField(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Tk()
+        calls = self.calls = []
+
+        class Order:
+            price = IntField(default=3)
+            quantity = IntField(default=2)
+
+            @ComputedField
+            def total(self):
+                calls.append('total')
+                return self.price * self.quantity
+
+            @ComputedField
+            def label(self):
+                calls.append('label')
+                return 'total {}'.format(self.total)
+
+        self.order = Order()
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_memoized(self):
+        self.assertEqual(self.order.label, 'total 6')
+        self.assertEqual(self.order.label, 'total 6')
+        self.assertEqual(self.calls, ['label', 'total'])
+        self.order.price = 5
+        self.assertEqual(self.order.label, 'total 10')
+        self.assertEqual(self.calls, ['label', 'total', 'label', 'total'])
+
+    def test_push_once(self):
+        # reading binds the field to the instance
+        self.assertEqual(self.order.label, 'total 6')
+        var = type(self.order).label.var
+        self.assertEqual(var.get(), 'total 6')
+        del self.calls[:]
+        self.order.price = 5
+        type(self.order).quantity.var.set(3)
+        self.assertEqual(self.calls, [])
+        self.root.update()
+        self.assertEqual(var.get(), 'total 15')
+        self.assertEqual(sorted(self.calls), ['label', 'total'])
+
+    def test_other_instance(self):
+        self.assertEqual(self.order.total, 6)
+        other = type(self.order)()
+        del self.calls[:]
+        self.assertEqual(other.total, 6)
+        self.assertEqual(self.calls, ['total'])
+        # the field stays bound to the instance which read it first
+        self.assertIs(type(self.order).total._instance, self.order)
+        self.assertEqual(self.order.total, 6)
+        self.assertEqual(self.calls, ['total'])
+
+    def test_flush_per_interpreter(self):
+        self.assertEqual(self.order.label, 'total 6')
+        var = type(self.order).label.var
+
+        class Other:
+            count = IntField()
+
+            @ComputedField
+            def double(self):
+                return self.count * 2
+
+        # variables of fields are created in the default root
+        other = Tk()
+        default, tkinter._default_root = tkinter._default_root, other
+        try:
+            item = Other()
+            self.assertEqual(item.double, 0)
+            Other.double.var
+            item.count = 1
+        finally:
+            tkinter._default_root = default
+        other.destroy()
+        # the flush left pending by a destroyed interpreter blocks no other one
+        self.order.price = 5
+        self.root.update()
+        self.assertEqual(var.get(), 'total 10')
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.order.total = 1
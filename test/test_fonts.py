@@ -0,0 +1,41 @@
+from tkinter import Tk, Label
+import unittest
+
+from tkouter.fonts import FontCache, parse_font
+
+
+class TestParseFont(unittest.TestCase):
+
+    def test_css(self):
+        self.assertEqual(parse_font('italic bold 12px "Courier New", monospace'),
+                         {'slant': 'italic', 'weight': 'bold', 'size': -12, 'family': 'Courier New'})
+        self.assertEqual(parse_font('16pt/1.5 Arial'), {'size': 16, 'family': 'Arial'})
+
+    def test_tk(self):
+        self.assertEqual(parse_font('{Courier New} 10 bold underline'),
+                         {'size': 10, 'weight': 'bold', 'underline': 1, 'family': 'Courier New'})
+        self.assertEqual(parse_font('Helvetica -12'), {'size': -12, 'family': 'Helvetica'})
+
+
+class TestFontCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Tk()
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_share(self):
+        cache = FontCache()
+        name = cache.name(self.root, 'bold 12pt Helvetica')
+        self.assertEqual(cache.name(self.root, 'Helvetica 12 bold'), name)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.name(self.root, 'TkFixedFont'), 'TkFixedFont')
+
+    def test_scale(self):
+        cache = FontCache()
+        name = cache.name(self.root, 'Helvetica 10')
+        label = Label(self.root, font=name)
+        cache.scale(2)
+        self.assertEqual(cache.font(self.root, 'Helvetica 10').cget('size'), 20)
+        self.assertEqual(str(label['font']), name)
@@ -0,0 +1,50 @@
+import os
+import tempfile
+from tkinter import Tk, PhotoImage
+import unittest
+
+from tkouter.images import ImageCache, parse_size
+
+
+class TestImageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Tk()
+        self.path = os.path.join(tempfile.mkdtemp(), 'icon.gif')
+        image = PhotoImage(master=self.root, width=8, height=8)
+        image.put('red', to=(0, 0, 8, 8))
+        image.write(self.path, format='gif')
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size('16x8'), (16, 8))
+        self.assertEqual(parse_size((16, 8)), (16, 8))
+        self.assertIsNone(parse_size(None))
+
+    def test_share(self):
+        cache = ImageCache()
+        key, image = cache.acquire(self.root, self.path)
+        other_key, other = cache.acquire(self.root, self.path)
+        self.assertIs(image, other)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.nbytes, 8 * 8 * 4)
+
+    def test_size(self):
+        cache = ImageCache()
+        _, image = cache.acquire(self.root, self.path, '4x4')
+        self.assertEqual((image.width(), image.height()), (4, 4))
+
+    def test_evict(self):
+        cache = ImageCache(budget=8 * 8 * 4)
+        key, _ = cache.acquire(self.root, self.path)
+        small, _ = cache.acquire(self.root, self.path, '4x4')
+        # images in use are never evicted
+        self.assertEqual(len(cache), 2)
+        cache.release(key)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.evictions, 1)
+        cache.release(small)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,39 @@
+import unittest
+
+from tkouter.options import *
+
+
+class TestOptionTypes(unittest.TestCase):
+
+    def test_number(self):
+        self.assertEqual(Int().convert('2'), 2)
+        self.assertEqual(Float().convert('0.5'), 0.5)
+        self.assertRaises(ValueError, Int().convert, 'two')
+
+    def test_bool(self):
+        self.assertIs(Bool().convert('Yes'), True)
+        self.assertIs(Bool().convert('0'), False)
+        self.assertRaises(ValueError, Bool().convert, 'maybe')
+
+    def test_color(self):
+        self.assertEqual(Color().convert('#a0b0c0'), '#a0b0c0')
+        self.assertEqual(Color().convert('light blue'), 'light blue')
+        self.assertRaises(ValueError, Color().convert, '#12')
+
+    def test_distance(self):
+        self.assertEqual(Distance().convert('3'), 3)
+        self.assertEqual(Distance().convert('1.5'), 1.5)
+        self.assertEqual(Distance().convert('2c'), '2c')
+        self.assertRaises(ValueError, Distance().convert, '2cm')
+        self.assertEqual(Pad().convert('2 4'), (2, 4))
+        self.assertRaises(ValueError, Pad().convert, '1 2 3')
+
+    def test_size(self):
+        self.assertEqual(Size().convert('32x16'), (32, 16))
+        self.assertRaises(ValueError, Size().convert, '32')
+
+    def test_enum(self):
+        self.assertEqual(Enum('x', 'y').convert('x'), 'x')
+        self.assertRaises(ValueError, Enum('x', 'y').convert, 'z')
+        self.assertEqual(Sticky().convert('nsew'), 'nsew')
+        self.assertRaises(ValueError, Sticky().convert, 'north')
@@ -0,0 +1,96 @@
+import gc
+import unittest
+
+from tkouter.pool import WidgetPool
+
+
+class FakeWidget:
+
+    def __init__(self, master, **options):
+        self.master = master
+        self.options = dict(options, relief='flat')
+        self.manager = 'pack'
+        self.destroyed = False
+        self.queries = 0
+
+    def configure(self, **options):
+        if not options:
+            self.queries += 1
+            return {name: (name, name, name, '', value) for name, value in self.options.items()}
+        self.options.update(options)
+
+    def winfo_manager(self):
+        return self.manager
+
+    def pack_forget(self):
+        self.manager = ''
+
+    def winfo_exists(self):
+        return not self.destroyed
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class TestWidgetPool(unittest.TestCase):
+
+    def test_acquire_release(self):
+        pool = WidgetPool(maxsize=2)
+        w0 = pool.acquire(FakeWidget, None, width=10)
+        w0.configure(relief='sunken')
+        pool.release(w0)
+        self.assertEqual(w0.manager, '')
+        self.assertEqual(w0.options['relief'], 'flat')
+        self.assertIs(pool.acquire(FakeWidget, None, width=10), w0)
+        self.assertIsNot(pool.acquire(FakeWidget, None, width=20), w0)
+        self.assertEqual((pool.hits, pool.misses), (1, 2))
+        self.assertAlmostEqual(pool.hit_rate, 1 / 3)
+
+    def test_release_twice(self):
+        pool = WidgetPool(maxsize=2)
+        w0 = pool.acquire(FakeWidget, None, width=10)
+        pool.release(w0)
+        pool.release(w0)
+        self.assertFalse(w0.destroyed)
+        self.assertEqual(len(pool), 1)
+        self.assertIs(pool.acquire(FakeWidget, None, width=10), w0)
+        self.assertEqual(len(pool), 0)
+        self.assertIsNot(pool.acquire(FakeWidget, None, width=10), w0)
+
+    def test_eviction(self):
+        pool = WidgetPool(maxsize=2)
+        widgets = [pool.acquire(FakeWidget, None, width=i) for i in range(3)]
+        for w in widgets:
+            pool.release(w)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.evictions, 1)
+        self.assertTrue(widgets[0].destroyed)
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+        self.assertTrue(all(w.destroyed for w in widgets))
+
+    def test_snapshot_per_key(self):
+        pool = WidgetPool(maxsize=2)
+        w0 = pool.acquire(FakeWidget, None, width=10)
+        w1 = pool.acquire(FakeWidget, None, width=10)
+        self.assertEqual((w0.queries, w1.queries), (1, 0))
+        w1.configure(relief='sunken')
+        pool.release(w1)
+        self.assertEqual(w1.options['relief'], 'flat')
+
+    def test_destroyed_widgets(self):
+        pool = WidgetPool(maxsize=2)
+        w0 = pool.acquire(FakeWidget, None, width=10)
+        pool.acquire(FakeWidget, None, width=20)
+        gc.collect()
+        # widgets destroyed without release are not kept by the pool
+        self.assertEqual(len(pool._keys), 1)
+        self.assertEqual(len(pool._snapshots), 1)
+        pool.release(w0)
+        w0.destroy()
+        self.assertIsNot(pool.acquire(FakeWidget, None, width=10), w0)
+        self.assertEqual(len(pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
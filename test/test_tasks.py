@@ -0,0 +1,94 @@
+from concurrent.futures.process import BrokenProcessPool
+import os
+import unittest
+
+from tkouter.tasks import Task, offload, shutdown
+
+
+class FakeDispatcher:
+    _ids = {}
+
+
+class FakeWidget:
+    dispatcher = FakeDispatcher()
+
+    def __init__(self):
+        self.callbacks = []
+        self.percent = None
+        self.results = []
+        self.errors = []
+
+    def after(self, ms, func):
+        self.callbacks.append(func)
+        return len(self.callbacks)
+
+    def after_cancel(self, after_id):
+        self.callbacks[after_id - 1] = None
+
+    def run(self, task):
+        task.future.exception(timeout=30)
+        while task.running:
+            func = self.callbacks.pop(0)
+            if func is not None:
+                func()
+
+    @offload(progress='percent', done='finished')
+    def square(n, progress):
+        progress(50)
+        return n * n
+
+    @offload(error='failed')
+    def fail():
+        raise ValueError('fail')
+
+    @offload(error='failed')
+    def crash():
+        os._exit(1)
+
+    def finished(self, result):
+        self.results.append(result)
+
+    def failed(self, e):
+        self.errors.append(e)
+
+
+class TestOffload(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown()
+
+    def setUp(self):
+        self.widget = FakeWidget()
+
+    def test_done(self):
+        task = self.widget.square(12)
+        self.assertIsInstance(task, Task)
+        self.widget.run(task)
+        self.assertEqual(self.widget.results, [144])
+        self.assertEqual(self.widget.percent, 50)
+
+    def test_error(self):
+        task = self.widget.fail()
+        self.widget.run(task)
+        self.assertIsInstance(self.widget.errors[0], ValueError)
+
+    def test_broken_pool(self):
+        task = self.widget.crash()
+        self.widget.run(task)
+        self.assertIsInstance(self.widget.errors[0], BrokenProcessPool)
+        # the pool is created again for the next task
+        task = self.widget.square(4)
+        self.widget.run(task)
+        self.assertEqual(self.widget.results, [16])
+
+    def test_cancel(self):
+        task = self.widget.square(3)
+        task.cancel()
+        self.assertFalse(task.running)
+        self.assertTrue(task.cancelled)
+        self.assertEqual(self.widget.results, [])
+
+    def test_bound_equality(self):
+        self.assertEqual(self.widget.square, self.widget.square)
+        self.assertNotEqual(self.widget.square, FakeWidget().square)
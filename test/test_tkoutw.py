@@ -1,13 +1,17 @@
 from io import StringIO
+from contextlib import redirect_stderr, redirect_stdout
+import pickle
 from tkinter import *
 from tkinter import ttk
 import unittest
 
 from lxml import etree
 from lxml.cssselect import CSSSelector
-from tkouter.core import TkGridMgr, TkOutWidget, TkOutElement, register
+from tkouter.core import TkGridMgr, TkOutWidget, TkOutElement, register, compile_layout
 from tkouter.errors import *
 from tkouter.fields import *
+from tkouter.styles import ttk_style
+from tkouter.widgets import Table
 from tkouter import settings
 from jinja2 import DictLoader
 
@@ -83,6 +87,174 @@ class TestWidgetWithCss(TkOutWidget):
         for b in self.select('button'):
             b.config(text='change')
 
+reload_sources = {
+    'reload.html': """
+        <html>
+            <head><link rel="stylesheet" type="text/css" href="reload.css" /></head>
+            <body>
+                <left name="left"><entry name="entry" /></left>
+                <top name="top"><button name="button"> old </button></top>
+            </body>
+        </html>""",
+    'reload.css': "top > button { width: 5; }",
+}
+
+class TestWidgetReload(TkOutWidget):
+    layout = 'reload.html'
+    loader = DictLoader(reload_sources)
+
+class TestWidgetRepeat(TkOutWidget):
+    layout = """
+        <html>
+            <body>
+                <for name="rowframe" each="{self.rows}" key="id" as="row">
+                    <label text="{row.name}" />
+                </for>
+            </body>
+        </html>"""
+
+    def __init__(self, parent):
+        self.rows = [{'id': i, 'name': str(i)} for i in range(5)]
+        super().__init__(parent)
+
+class TestWidgetRepeatCss(TestWidgetRepeat):
+    layout = "repeat.html"
+    loader = DictLoader({
+        'repeat.html': """
+            <html>
+                <head><link rel="stylesheet" type="text/css" href="repeat.css" /></head>
+                <body>
+                    <for name="rowframe" each="{self.rows}" key="id" as="row">
+                        <label text="{row.name}" />
+                    </for>
+                </body>
+            </html>""",
+        'repeat.css': "for > label { width: 5; } label { height: 2; }",
+    })
+
+class TestWidgetCompact(TkOutWidget):
+    layout = """<html><body><left><button id="b0" class="btn" /><button name="ok" /></left></body></html>"""
+    compact = True
+
+class TestWidgetCompactLazyMenu(TkOutWidget):
+    layout = """<html><head><menu><menu label="Lazy" lazy="1"><command /></menu></menu></head><body></body></html>"""
+    compact = True
+
+class TestWidgetLazyMenu(TkOutWidget):
+    layout = """
+        <html>
+            <head>
+                <menu>
+                    <menu name="lazymenu" label="Lazy" lazy="1">
+                        <command> first </command>
+                        <menu name="nested" label="Nested"><command> nested </command></menu>
+                    </menu>
+                    <menu name="recentmenu" label="Recent" source="{self.recent}" command="{self.open}" />
+                </menu>
+            </head>
+            <body></body>
+        </html>"""
+
+    def __init__(self, parent):
+        self.recent = ['a', 'b']
+        self.opened = []
+        super().__init__(parent)
+
+    def open(self, entry):
+        self.opened.append(entry)
+
+class TestWidgetClassRules(TkOutWidget):
+    layout = "rules.html"
+    loader = DictLoader({
+        'rules.html': """
+            <html>
+                <head><link rel="stylesheet" type="text/css" href="rules.css" /></head>
+                <body>
+                    <button name="plain" />
+                    <button name="custom" width="3" />
+                    <checkbutton name="check" />
+                </body>
+            </html>""",
+        'rules.css': "button { width: 7; } checkbutton { foreground: red; width: 4; }",
+    })
+
+class TreeSource:
+
+    def children(self, node):
+        node = node or ()
+        return [node + (i,) for i in range(5)] if len(node) < 3 else []
+
+    def has_children(self, node):
+        return len(node) < 3
+
+class TestWidgetLazyTree(TkOutWidget):
+    layout = """<html><body><lazytree name="tree" source="{self.source}" chunk="2" /></body></html>"""
+
+    def __init__(self, parent):
+        self.source = TreeSource()
+        super().__init__(parent)
+
+class TestWidgetCanvas(TkOutWidget):
+    layout = """
+        <html>
+            <body>
+                <canvas name="canvas">
+                    <layer name="bars" kind="rectangle" data="{self.bars}" fill="gray" />
+                    <layer name="curve" data="{self.curve}" />
+                </canvas>
+            </body>
+        </html>"""
+
+    def __init__(self, parent):
+        self.bars = [(0, 0, 10, 10), (20, 0, 30, 10)]
+        self.curve = [(0, 0, 10, 10, 20, 5)]
+        super().__init__(parent)
+
+class TestWidgetLogView(TkOutWidget):
+    layout = """<html><body><logview name="log" maxlines="3" buffer="4" /></body></html>"""
+
+class TestWidgetLazy(TkOutWidget):
+    layout = """
+        <html>
+            <body>
+                <button name="first" />
+                <top type="labelframe" name="panel" lazy="1">
+                    <listbox name="items" />
+                </top>
+                <button name="last" />
+            </body>
+        </html>"""
+
+class TestWidgetNestedLazy(TkOutWidget):
+    layout = """
+        <html>
+            <body>
+                <top name="outer" lazy="1">
+                    <label name="title" />
+                    <left name="inner" lazy="1">
+                        <entry name="deep" />
+                    </left>
+                    <button name="after" />
+                </top>
+            </body>
+        </html>"""
+
+class TestWidgetTable(TkOutWidget):
+    layout = """
+        <html>
+            <body>
+                <table name="table" source="{self.matrix}" rows="3" columns="2"
+                       header_rows="1" header_columns="1" formatter="{self.fmt}" />
+            </body>
+        </html>"""
+
+    def __init__(self, parent):
+        self.matrix = [[i * 100 + j for j in range(50)] for i in range(1000)]
+        super().__init__(parent)
+
+    def fmt(self, value):
+        return str(value)
+
 class TestWidgetWithoutLayout(TkOutWidget):
     pass
 
@@ -113,6 +285,37 @@ class TestTagInWrongScopeGr(TkOutWidget):
 class TestTagInWrongScopeGd(TkOutWidget):
     layout = """<html><body><grid><gr><gd><gr></gr></gd></gr></grid></body></html>"""
 
+class TestOptionErrorUnknown(TkOutWidget):
+    layout = """<html><body><button widht="3" /></body></html>"""
+
+class TestOptionErrorInvalid(TkOutWidget):
+    layout = """<html><body><grid><gr><gd rowspan="two"><label /></gd></gr></grid></body></html>"""
+
+class TestOptionErrorClassRule(TkOutWidget):
+    layout = """<html><head><link rel="stylesheet" type="text/css" href="rules.css" /></head>
+        <body><button /></body></html>"""
+    loader = DictLoader({'rules.css': "button { relief: wavy; widht: 3; pack-fill: x; pack-expand: maybe; }"})
+
+class TestOptionErrorTtkRule(TkOutWidget):
+    layout = TestWidgetClassRules.layout
+    loader = DictLoader({'rules.html': TestWidgetClassRules.loader.mapping['rules.html'],
+                         'rules.css': "body > checkbutton { foreground: red; }"})
+
+class TestWidgetComputed(TkOutWidget):
+    layout = """<html><body><label name="label" textvariable="{self.total.var}" /></body></html>"""
+    price = IntField(default=3)
+
+    def __init__(self, parent):
+        self.calls = 0
+        super().__init__(parent)
+
+    @ComputedField
+    def total(self):
+        self.calls += 1
+        return self.price * 2
+
+class TestWidgetPropagate(TkOutWidget):
+    layout = """<html><body><top /><top propagate="0" /><top propagate="False" /></body></html>"""
 
 class TestTkOutWidget(unittest.TestCase):
 
@@ -196,12 +399,16 @@ class TestTkOutWidget(unittest.TestCase):
         self.assertEqual(notebook.parent_widget, self.tkoutw)
         self.assertEqual(button.parent_widget, left.widget)
         self.assertEqual(grid.gridmgr, gd_0.gridmgr)
-        self.assertEqual(button._options['command'], self.tkoutw.test)
+        self.assertEqual(self.tkoutw.dispatcher.handlers[button._handler_ids[0]], self.tkoutw.test)
+        self.assertTrue(button._options['command'].startswith(self.tkoutw.dispatcher.name))
         self.assertEqual(button._options['text'], 'test button')
         self.assertEqual(entry_0._options['textvariable'], self.tkoutw.__class__.__dict__['strfield'].var)
+        self.assertEqual(entry_0._options['validatecommand'],
+                         '::tkouter::validate {::tkouter::validate_string 5 {}} %W %v %V %P')
+        self.assertEqual(entry_0._options['validate'], 'all')
         self.assertEqual(left.pack_options['fill'], 'both')
         self.assertEqual(gd_0.grid_options, {'row': 0, 'column': 0})
-        self.assertEqual(gd_1.grid_options, {'row': 0, 'column': 1, 'rowspan': '2', 'columnspan': '2'})
+        self.assertEqual(gd_1.grid_options, {'row': 0, 'column': 1, 'rowspan': 2, 'columnspan': 2})
         self.assertEqual(gd_2.grid_options, {'row': 1, 'column': 0})
         self.assertIsNone(title.widget)
         self.assertIsInstance(button.widget, Button)
@@ -224,13 +431,334 @@ class TestTkOutWidget(unittest.TestCase):
         self.tkoutw = TestWidgetWithCss(root)
         button = self.select_one_element('left > button')
         self.assertEqual(button._options['text'], 'test button')
-        self.assertEqual(button._options['width'], '8')
+        self.assertEqual(button._options['width'], 8)
         self.assertEqual(button.widget['text'], 'test button')
         self.assertEqual(button.widget['width'], 8)
         # select funcion
         self.tkoutw.test()
         self.assertEqual(button.widget['text'], 'change')
 
+    def test_apply_stylesheet(self):
+        root = Tk()
+        self.tkoutw = TestWidgetWithCss(root)
+        button = self.select_one_element('left > button')
+        css = "left > button { width: 12; text: nouse; }"
+        self.assertEqual(self.tkoutw.apply_stylesheet(css), 1)
+        self.assertEqual(button.widget['width'], 12)
+        # inline options win over the stylesheet
+        self.assertEqual(button.widget['text'], 'test button')
+        # nothing changed, nothing configured
+        self.assertEqual(self.tkoutw.apply_stylesheet(css), 0)
+        # removed declarations go back to the defaults
+        self.assertEqual(self.tkoutw.apply_stylesheet(""), 1)
+        self.assertEqual(button.widget['width'], 0)
+        self.assertIsNone(button.get('width'))
+        # a bad stylesheet is reported before anything changes
+        self.tkoutw.apply_stylesheet(css)
+        with self.assertRaises(OptionError) as cm:
+            self.tkoutw.apply_stylesheet("left > button { width: abc; relief: flat; }")
+        self.assertIn('<button> option "width"', str(cm.exception))
+        self.assertEqual(button.widget['width'], 12)
+        self.assertEqual(button.get('width'), '12')
+        self.assertIsNone(button.get('relief'))
+        self.assertEqual(self.tkoutw._css, css)
+
+    def test_apply_stylesheet_repeat(self):
+        root = Tk()
+        self.tkoutw = TestWidgetRepeatCss(root)
+        repeat = self.select_one_element('for')._repeat
+        self.assertEqual([(l['width'], l['height']) for l in repeat.widgets], [(5, 2)] * 5)
+        # class rules lose to the other rules whatever their order, like at build
+        self.tkoutw.apply_stylesheet("label { width: 4; height: 3; } for > label { width: 6; }")
+        self.assertEqual([(l['width'], l['height']) for l in repeat.widgets], [(6, 3)] * 5)
+        # new items take the new stylesheet
+        self.tkoutw.rows.append({'id': 5, 'name': '5'})
+        self.tkoutw.refresh()
+        self.assertEqual((repeat.widgets[-1]['width'], repeat.widgets[-1]['height']), (6, 3))
+        # old class rules are not left in the option database
+        self.tkoutw.apply_stylesheet("")
+        self.tkoutw.rows.append({'id': 6, 'name': '6'})
+        self.tkoutw.refresh()
+        self.assertEqual([(l['width'], l['height']) for l in repeat.widgets], [(0, 0)] * 7)
+
+    def test_reload(self):
+        root = Tk()
+        self.tkoutw = TestWidgetReload(root)
+        entry, button = self.tkoutw.entry, self.tkoutw.button
+        watcher = self.tkoutw.watch()
+        self.assertFalse(watcher.is_outdated)
+        reload_sources['reload.css'] = "top > button { width: 9; }"
+        self.assertTrue(watcher.is_outdated)
+        self.assertEqual(self.tkoutw.reload(), 1)
+        self.assertIs(self.tkoutw.entry, entry)
+        self.assertIsNot(self.tkoutw.button, button)
+        self.assertEqual(self.tkoutw.button['width'], 9)
+        self.assertFalse(watcher.is_outdated)
+        watcher.stop()
+
+    def test_reload_broken_layout(self):
+        root = Tk()
+        self.tkoutw = TestWidgetReload(root)
+        entry, button, tree = self.tkoutw.entry, self.tkoutw.button, self.tkoutw._tree
+        counter = self.tkoutw.widget_type_counter
+        source = reload_sources['reload.html']
+        reload_sources['reload.html'] = source.replace('<entry name="entry" />', '<nosuchtag />')
+        try:
+            self.assertRaises(TagUnRecognizedError, self.tkoutw.reload)
+        finally:
+            reload_sources['reload.html'] = source
+        self.assertIs(self.tkoutw._tree, tree)
+        self.assertIs(self.tkoutw.entry, entry)
+        self.assertIs(self.tkoutw.button, button)
+        self.assertIs(self.tkoutw.widget_type_counter, counter)
+        self.assertEqual(self.tkoutw.reload(), 0)
+        self.assertIs(self.tkoutw.entry, entry)
+
+    def test_watch_broken_layout(self):
+        root = Tk()
+        self.tkoutw = TestWidgetReload(root)
+        watcher = self.tkoutw.watch()
+        watcher.stop()
+        source = reload_sources['reload.html']
+        reload_sources['reload.html'] = source.replace('<entry name="entry" />', '<nosuchtag />')
+        try:
+            self.assertTrue(watcher.is_outdated)
+            with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+                watcher.reload()
+            # a failed reload is not retried until a template changes again
+            self.assertFalse(watcher.is_outdated)
+            reload_sources['reload.css'] = "top > button { width: 7; }"
+            self.assertTrue(watcher.is_outdated)
+        finally:
+            reload_sources['reload.html'] = source
+        watcher.reload()
+        self.assertFalse(watcher.is_outdated)
+        self.assertEqual(self.tkoutw.button['width'], 7)
+
+    def test_repeat(self):
+        root = Tk()
+        self.tkoutw = TestWidgetRepeat(root)
+        repeat = self.select_one_element('for')._repeat
+        labels = repeat.widgets
+        self.assertEqual([l['text'] for l in labels], ['0', '1', '2', '3', '4'])
+        self.assertEqual(self.tkoutw.rowframe.pack_slaves(), labels)
+        rows = self.tkoutw.rows
+        self.tkoutw.rows = [rows[4], rows[1], rows[2], {'id': 5, 'name': '5'}, rows[0]]
+        self.tkoutw.refresh()
+        self.assertEqual(repeat.last_diff, (1, 2, 1))
+        self.assertEqual([l['text'] for l in repeat.widgets], ['4', '1', '2', '5', '0'])
+        self.assertEqual(self.tkoutw.rowframe.pack_slaves(), repeat.widgets)
+        self.assertIs(repeat.widgets[1], labels[1])
+        # an item changed in place is rebuilt
+        self.tkoutw.rows[1]['name'] = 'changed'
+        self.tkoutw.refresh()
+        self.assertEqual(repeat.last_diff, (1, 0, 1))
+        self.assertEqual(repeat.widgets[1]['text'], 'changed')
+        self.tkoutw.rows.append({'id': 1, 'name': 'duplicated'})
+        self.assertRaises(RepeatKeyError, self.tkoutw.refresh)
+        # keys of mappings are looked up even when a method has the same name
+        repeat.element.set('key', 'values')
+        self.assertEqual(repeat.key({'values': 3}), 3)
+
+    def test_compact(self):
+        root = Tk()
+        self.tkoutw = TestWidgetCompact(root)
+        self.assertFalse(hasattr(self.tkoutw, '_tree'))
+        self.assertFalse(hasattr(self.tkoutw, '_proxy_cache'))
+        self.assertEqual(len(list(self.tkoutw.select('button'))), 2)
+        self.assertEqual(list(self.tkoutw.select('button#b0, .btn')), [self.tkoutw.button_0])
+        self.assertEqual(list(self.tkoutw.select('[name=ok]')), [self.tkoutw.ok])
+        self.assertRaises(CompactModeError, self.tkoutw.select, 'left > button')
+        self.assertRaises(CompactModeError, self.tkoutw.reload)
+        self.assertRaises(CompactModeError, TestWidgetCompactLazyMenu, root)
+
+    def test_lazy_menu(self):
+        root = Tk()
+        self.tkoutw = TestWidgetLazyMenu(root)
+        lazy = self.select_one_element('menu[name=lazymenu]')
+        recent = self.select_one_element('menu[name=recentmenu]')
+        # index 0 is the tearoff entry
+        self.assertEqual(lazy.widget.index('end'), 0)
+        self.assertFalse(hasattr(self.tkoutw, 'nested'))
+        lazy._post_menu()
+        self.assertEqual(lazy.widget.index('end'), 2)
+        self.assertIsInstance(self.tkoutw.nested, Menu)
+        recent._post_menu()
+        self.assertEqual(recent.widget.entrycget(2, 'label'), 'b')
+        recent.widget.invoke(2)
+        self.assertEqual(self.tkoutw.opened, ['b'])
+        self.tkoutw.recent = ['c']
+        recent._post_menu()
+        self.assertEqual(recent.widget.index('end'), 1)
+        self.assertEqual(recent.widget.entrycget(1, 'label'), 'c')
+
+    def test_lazy_container(self):
+        root = Tk()
+        self.tkoutw = TestWidgetLazy(root)
+        self.assertNotIn('panel', vars(self.tkoutw))
+        self.assertNotIn('items', vars(self.tkoutw))
+        self.assertEqual(list(self.tkoutw.select('listbox')), [])
+        # using a widget in the container builds the container unpacked
+        self.assertIsInstance(self.tkoutw.items, Listbox)
+        self.assertEqual(self.tkoutw.panel.winfo_manager(), '')
+        self.assertEqual(list(self.tkoutw.select('listbox')), [self.tkoutw.items])
+        # shown in its place of the layout
+        self.tkoutw.materialize('panel', show=True)
+        slaves = self.tkoutw.pack_slaves()
+        self.assertEqual(slaves, [self.tkoutw.first, self.tkoutw.panel, self.tkoutw.last])
+        self.assertRaises(AttributeError, getattr, self.tkoutw, 'missing')
+
+    def test_nested_lazy_container(self):
+        root = Tk()
+        self.tkoutw = TestWidgetNestedLazy(root)
+        self.assertFalse(hasattr(self.tkoutw, 'nothing'))
+        # builds the outer container, then the inner one holding the entry
+        self.assertIsInstance(self.tkoutw.deep, Entry)
+        self.assertEqual(self.tkoutw.outer.winfo_manager(), '')
+        self.assertEqual(self.tkoutw.outer.pack_slaves(),
+                         [self.tkoutw.title, self.tkoutw.inner, self.tkoutw.after])
+        self.assertEqual(list(self.tkoutw.select('entry')), [self.tkoutw.deep])
+
+    def test_class_rules(self):
+        root = Tk()
+        self.tkoutw = TestWidgetClassRules(root)
+        plain = self.select_one_element('button[name=plain]')
+        check = self.select_one_element('checkbutton')
+        self.assertNotIn('width', plain._options)
+        self.assertEqual(self.tkoutw.plain['width'], 7)
+        self.assertEqual(self.tkoutw.custom['width'], 3)
+        # rules are scoped by the path name, the frame stays a Frame
+        self.assertEqual(self.tkoutw.winfo_class(), 'Frame')
+        other = Frame(root)
+        self.assertEqual(Button(other)['width'], 0)
+        style = self.tkoutw.check['style']
+        self.assertEqual(style, ttk_style(self.tkoutw, 'TCheckbutton', {'foreground': 'red'}))
+        self.assertEqual(ttk.Style(root).lookup(style, 'foreground'), 'red')
+        self.assertEqual(check._options['width'], '4')
+        # other rules check the options of ttk widgets like the build does
+        with self.assertRaises(OptionError) as cm:
+            self.tkoutw.apply_stylesheet("body > checkbutton { foreground: blue; }")
+        self.assertIn('<checkbutton> unknown option "foreground"', str(cm.exception))
+        self.assertEqual(self.tkoutw.check['style'], style)
+        # class rules still do
+        self.tkoutw.apply_stylesheet("checkbutton { foreground: blue; }")
+        style = self.tkoutw.check['style']
+        self.assertEqual(style, ttk_style(self.tkoutw, 'TCheckbutton', {'foreground': 'blue'}))
+        self.assertEqual(check.get('width'), None)
+
+    def test_computed_field(self):
+        root = Tk()
+        first = TestWidgetComputed(root)
+        self.tkoutw = TestWidgetComputed(root)
+        field = TestWidgetComputed.total
+        # the widget built last is bound, others compute without the cache
+        self.assertIs(field._instance, self.tkoutw)
+        self.assertEqual(field.var.get(), '6')
+        calls = first.calls
+        self.assertEqual(first.total, 6)
+        self.assertEqual(first.total, 6)
+        self.assertEqual(first.calls, calls + 2)
+        # a destroyed widget is released and not computed by a pending flush
+        calls = self.tkoutw.calls
+        first.price = 4
+        self.tkoutw.destroy()
+        self.assertIsNone(field._instance)
+        root.update()
+        self.assertEqual(self.tkoutw.calls, calls)
+        # the next reader binds the field
+        self.assertEqual(first.total, 8)
+        self.assertIs(field._instance, first)
+
+    def test_lazy_tree(self):
+        root = Tk()
+        self.tkoutw = TestWidgetLazyTree(root)
+        tree = self.tkoutw.tree
+        self.assertEqual(len(tree.get_children()), 2)
+        while tree.is_loading():
+            root.update()
+        items = tree.get_children()
+        self.assertEqual(len(items), 5)
+        self.assertEqual(tree.get_children(items[0]), (items[0] + '.placeholder',))
+        tree.focus(items[0])
+        tree.event_generate('<<TreeviewOpen>>')
+        self.assertEqual(tree.node(tree.get_children(items[0])[0]), (0, 0))
+
+    def test_canvas(self):
+        root = Tk()
+        self.tkoutw = TestWidgetCanvas(root)
+        canvas = self.tkoutw.canvas
+        self.assertEqual(canvas.layers, ['bars', 'curve'])
+        bars = canvas.find_withtag(canvas.layer_tag('bars'))
+        self.assertEqual(len(bars), 2)
+        self.assertEqual(canvas.itemcget(bars[0], 'fill'), 'gray')
+        # same number of rows moves the items
+        canvas.set_data('bars', [(0, 0, 5, 5), (20, 0, 25, 5)])
+        self.assertEqual(canvas.find_withtag(canvas.layer_tag('bars')), bars)
+        self.assertEqual(canvas.coords(bars[0]), [0.0, 0.0, 5.0, 5.0])
+        # recreated layer stays below the later layer
+        canvas.set_data('bars', [(0, 0, 5, 5)])
+        self.assertEqual(len(canvas.find_withtag(canvas.layer_tag('bars'))), 1)
+        self.assertEqual(canvas.find_all()[-1], canvas.find_withtag(canvas.layer_tag('curve'))[0])
+
+    def test_table(self):
+        root = Tk()
+        self.tkoutw = TestWidgetTable(root)
+        table = self.tkoutw.table
+        # python options of custom widgets take the callable itself
+        self.assertEqual(table.formatter, self.tkoutw.fmt)
+        self.assertEqual(len(self.tkoutw.dispatcher), 0)
+        # 1 header row and 3 rows, 1 header column and 2 columns
+        self.assertEqual(len(table.grid_slaves()), 4 * 3 + 2)
+        self.assertEqual(table.cell(2, 1)['text'], '201')
+        table.scroll_to(row=500, column=10)
+        self.assertEqual(table.cell(500, 10)['text'], '50010')
+        self.assertEqual(table.cell(0, 10)['text'], '10')
+        self.assertEqual(table.cell(500, 0)['text'], '50000')
+        self.assertIsNone(table.cell(2, 1))
+        # scrolling is clamped to the end of the source
+        table.yview('moveto', 1.0)
+        self.assertEqual(table.top, 1000 - 1 - 3)
+        table.source[998][10] = 'x'
+        table.refresh()
+        self.assertEqual(table.cell(998, 10)['text'], 'x')
+        # the focused entry cell is committed before it shows another row
+        matrix = [[i * 10 + j for j in range(3)] for i in range(10)]
+        editable = Table(root, source=matrix, rows=2, columns=2, cell='entry')
+        editable.pack()
+        cell = editable.cell(0, 0)
+        cell.focus_force()
+        root.update()
+        cell.delete(0, 'end')
+        cell.insert(0, 'edited')
+        editable.yview('scroll', 1, 'units')
+        self.assertEqual(matrix[0][0], 'edited')
+        self.assertEqual(cell.get(), '10')
+
+    def test_log_view(self):
+        root = Tk()
+        self.tkoutw = TestWidgetLogView(root)
+        log = self.tkoutw.log
+        for i in range(6):
+            log.append('line {}'.format(i))
+        log._drain()
+        self.assertEqual(log.get('1.0', 'end-1c'), 'line 3\nline 4\nline 5\n')
+        self.assertEqual(log.stats['dropped'], 2)
+        self.assertEqual(log.stats['displayed'], 4)
+        self.assertEqual(log.stats['trimmed'], 1)
+
+    def test_destroy(self):
+        root = Tk()
+        commands = []
+        for _ in range(3):
+            self.tkoutw = TestWidget(root)
+            button = self.select_one_element('notebook button')
+            self.tkoutw.destroy()
+            self.assertFalse(hasattr(button, 'tkoutw'))
+            self.assertFalse(hasattr(self.tkoutw, 'button_0'))
+            commands.append(len(root.tk.call('info', 'commands')))
+        self.assertEqual(commands[1], commands[2])
+        self.assertEqual(str(root['menu']), '')
+
     def test_no_layout(self):
         root = Tk()
         self.tkoutw = TestWidgetWithoutLayout(root)
@@ -249,6 +777,38 @@ class TestTkOutWidget(unittest.TestCase):
         self.assertRaises(TagInWrongScope, TestTagInWrongScopeGrid, root)
         self.assertRaises(TagInWrongScope, TestTagInWrongScopeGr, root)
         self.assertRaises(TagInWrongScope, TestTagInWrongScopeGd, root)
+        self.assertRaises(OptionError, TestOptionErrorUnknown, root)
+        self.assertRaises(OptionError, TestOptionErrorInvalid, root)
+
+
+class TestCompiledLayout(unittest.TestCase):
+
+    def test_pickle(self):
+        compiled = pickle.loads(pickle.dumps(compile_layout(TestWidgetWithCss)))
+        self.assertEqual(compiled.templates, [])
+        self.assertIsNotNone(compiled.css)
+        tree, proxy_cache = compiled.instantiate()
+        self.assertEqual(len(proxy_cache), len(list(tree.getroot().iter())))
+        button = tree.getroot().find('.//button')
+        self.assertEqual(button.get('width'), '8')
+        self.assertEqual(button._typed[('', 'width')], 8)
+
+    def test_propagate(self):
+        compiled = compile_layout(TestWidgetPropagate)
+        tree, _ = compiled.instantiate()
+        self.assertEqual([e.propagates for e in tree.getroot().iter('top')], [True, False, False])
+
+    def test_class_rule_options(self):
+        with self.assertRaises(OptionError) as cm:
+            compile_layout(TestOptionErrorClassRule)
+        self.assertIn('css rule "button": option "relief"', str(cm.exception))
+        self.assertIn('css rule "button": unknown option "widht"', str(cm.exception))
+        self.assertIn('css rule "button": option "pack-expand"', str(cm.exception))
+        self.assertNotIn('pack-fill', str(cm.exception))
+        # only class rules put the options of ttk widgets into a style
+        with self.assertRaises(OptionError) as cm:
+            compile_layout(TestOptionErrorTtkRule)
+        self.assertIn('<checkbutton> unknown option "foreground"', str(cm.exception))
 
 
 class TestTkGridMgr(unittest.TestCase):
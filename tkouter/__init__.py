@@ -10,4 +10,7 @@ This package helps user to use MVC pattern to do GUI design.
 
 from .errors import *
 from .core import *
-from .fields import *
\ No newline at end of file
+from .fields import *
+from .pool import *
+from .widgets import *
+from .tasks import *
@@ -0,0 +1,194 @@
+""" Module contains the event bindings declared in layouts
+
+usage:
+    <entry bind-KeyRelease.debounce-300="{self.search}" />
+    <canvas bind-Motion.throttle-50="{self.hover}" />
+"""
+
+__all__ = [
+    'parse_binding',
+    'check_sequence',
+    'Debounce',
+    'Throttle',
+    'Bindings',
+]
+
+
+from functools import partial
+from itertools import count
+import re
+from tkinter import TclError
+
+from .errors import OptionError
+
+
+_MODIFIER = re.compile(r'(debounce|throttle)-(\d+)')
+_tag_ids = count()
+
+# event sequences tk accepted, checked once by binding them to a probe tag
+_PROBE_TAG = 'TkOutBindProbe'
+_valid_sequences = set()
+
+
+def parse_binding(attr):
+    """ parse the attribute name after "bind-" into (sequence, modifier, ms)
+    modifier and ms are None if the binding has no modifier.
+    The sequence itself is checked by tk when it is bound, see check_sequence.
+    """
+    event, _, modifier = attr.partition('.')
+    if not event:
+        raise ValueError('binding "{}" has no event'.format(attr))
+    sequence = '<{}>'.format(event)
+    if not modifier:
+        return sequence, None, None
+    match = _MODIFIER.fullmatch(modifier)
+    if match is None:
+        msg = 'modifier "{}" should be debounce-<ms> or throttle-<ms>'
+        raise ValueError(msg.format(modifier))
+    return sequence, match.group(1), int(match.group(2))
+
+
+def check_sequence(tk, sequence):
+    """ raise TclError if tk does not accept the event sequence """
+    if sequence not in _valid_sequences:
+        tk.call('bind', _PROBE_TAG, sequence, '#')
+        tk.call('bind', _PROBE_TAG, sequence, '')
+        _valid_sequences.add(sequence)
+
+
+class Debounce:
+    """ call the handler once events stop coming for ms milliseconds
+    Events of each widget are timed separately, so a group of widgets sharing
+    the handler does not drop the events of one widget for another's.
+    """
+
+    def __init__(self, widget, handler, ms):
+        self.widget = widget
+        self.handler = handler
+        self.ms = ms
+        # event widget -> after id
+        self._after_ids = {}
+
+    def __call__(self, event):
+        key = getattr(event, 'widget', None)
+        if key in self._after_ids:
+            self.widget.after_cancel(self._after_ids[key])
+        self._after_ids[key] = self.widget.after(self.ms, self._fire, key, event)
+
+    def _fire(self, key, event):
+        del self._after_ids[key]
+        self.handler(event)
+
+    def cancel(self):
+        for after_id in self._after_ids.values():
+            self.widget.after_cancel(after_id)
+        self._after_ids = {}
+
+
+class Throttle(Debounce):
+    """ call the handler at most once per ms milliseconds for each widget
+    The last event in a period is handled at its end, so it is not lost.
+    """
+
+    def __init__(self, widget, handler, ms):
+        super().__init__(widget, handler, ms)
+        # event widget -> last event waiting for the end of the period
+        self._pending = {}
+
+    def __call__(self, event):
+        key = getattr(event, 'widget', None)
+        if key not in self._after_ids:
+            self.handler(event)
+            self._after_ids[key] = self.widget.after(self.ms, self._fire, key, None)
+        else:
+            self._pending[key] = event
+
+    def _fire(self, key, event):
+        del self._after_ids[key]
+        event = self._pending.pop(key, None)
+        if event is not None:
+            self(event)
+
+    def cancel(self):
+        super().cancel()
+        self._pending = {}
+
+
+class Bindings:
+    """ event bindings of a tkouter widget, collapsed by bindtags
+
+    Widgets binding the same handler to the same event with the same
+    modifier share one generated bindtag, so the binding is made once by
+    bind_class instead of once per widget. A debounced or throttled handler
+    then has one wrapper for the whole group, timing each widget separately. Bindtags are reference counted
+    and unbound when their last widget releases them, or when the tkouter
+    widget is destroyed.
+    Handlers are called through the dispatcher of the tkouter widget, so
+    they are profiled like callable options.
+    """
+
+    _wrappers = {None: None, 'debounce': Debounce, 'throttle': Throttle}
+
+    def __init__(self, tkoutw):
+        self.tkoutw = tkoutw
+        # (sequence, modifier, ms, handler) -> bindtag
+        self._tags = {}
+        # bindtag -> [key, sequence, handler or wrapper, tcl command, references, handler id]
+        self._groups = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    def bind(self, widget, attr, handler, source=None):
+        """ bind the handler to widget by the attribute name after "bind-"
+        Return the bindtag. Raise OptionError if tk rejects the event sequence.
+        """
+        sequence, modifier, ms = parse_binding(attr)
+        try:
+            check_sequence(self.tkoutw.tk, sequence)
+        except TclError as e:
+            raise OptionError('option "bind-{}": {}'.format(attr, e)) from None
+        key = (sequence, modifier, ms, handler)
+        try:
+            tag = self._tags.get(key)
+        except TypeError:
+            key, tag = None, None
+        dispatcher = self.tkoutw.dispatcher
+        hid = dispatcher.add(handler, source)
+        if tag is None:
+            tag = '{}Bind{}'.format(self.tkoutw.winfo_class(), next(_tag_ids))
+            call = partial(dispatcher.dispatch, hid)
+            wrapper_cls = self._wrappers[modifier]
+            func = call if wrapper_cls is None else wrapper_cls(self.tkoutw, call, ms)
+            funcid = self.tkoutw.bind_class(tag, sequence, func)
+            if key is not None:
+                self._tags[key] = tag
+            self._groups[tag] = [key, sequence, func, funcid, 0, hid]
+        self._groups[tag][4] += 1
+        tags = widget.bindtags()
+        widget.bindtags(tags[:1] + (tag,) + tags[1:])
+        return tag
+
+    def release(self, tag):
+        """ drop one reference of the bindtag """
+        group = self._groups[tag]
+        group[4] -= 1
+        self.tkoutw.dispatcher.release(group[5])
+        if group[4] == 0:
+            self._unbind(tag)
+
+    def clear(self):
+        for tag, group in list(self._groups.items()):
+            for _ in range(group[4]):
+                self.tkoutw.dispatcher.release(group[5])
+            self._unbind(tag)
+
+    def _unbind(self, tag):
+        key, sequence, func, funcid, _, _ = self._groups.pop(tag)
+        if key is not None:
+            del self._tags[key]
+        if isinstance(func, Debounce):
+            func.cancel()
+        # commands of bind_class are not deleted with any widget
+        self.tkoutw.unbind_class(tag, sequence)
+        self.tkoutw.deletecommand(funcid)
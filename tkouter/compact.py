@@ -0,0 +1,75 @@
+""" Module contains the index kept by tkouter widgets in compact mode
+"""
+
+__all__ = [
+    'CompactIndex',
+]
+
+
+import re
+
+from .errors import CompactModeError
+
+
+SIMPLE_SELECTOR = re.compile(r"""
+    (?P<tag>[\w-]+|\*)?
+    (?P<id>\#[\w-]+)?
+    (?P<classes>(\.[\w-]+)*)
+    (\[name=(?P<quote>["']?)(?P<name>[\w-]+)(?P=quote)\])?
+""", re.VERBOSE)
+
+
+class CompactIndex:
+    """ array-backed index of built widgets
+
+    It keeps the tag, name, id and classes of every element which has a
+    widget in parallel lists, which is enough for select() on simple
+    selectors like "button", "#ok", ".btn", "button.btn" or "[name=ok]",
+    and comma separated groups of them.
+    """
+
+    def __init__(self, elements):
+        self.tags = []
+        self.names = []
+        self.ids = []
+        self.classes = []
+        self.widgets = []
+        for e in elements:
+            if e._widget is not None:
+                self.tags.append(e.tag)
+                self.names.append(e.widget_name)
+                self.ids.append(e.get('id'))
+                self.classes.append(tuple(e.get('class', '').split()))
+                self.widgets.append(e._widget)
+
+    def __len__(self):
+        return len(self.widgets)
+
+    @staticmethod
+    def _parse(selector_str):
+        conditions = []
+        for group in selector_str.split(','):
+            match = SIMPLE_SELECTOR.fullmatch(group.strip())
+            if match is None or not group.strip():
+                msg = 'selector "{}" is not supported in compact mode'
+                raise CompactModeError(msg.format(selector_str))
+            tag = match.group('tag')
+            conditions.append((
+                None if tag == '*' else tag,
+                match.group('id') and match.group('id')[1:],
+                [c for c in match.group('classes').split('.') if c],
+                match.group('name'),
+            ))
+        return conditions
+
+    def _match(self, i, tag, id_, classes, name):
+        return ((tag is None or self.tags[i] == tag)
+                and (id_ is None or self.ids[i] == id_)
+                and all(c in self.classes[i] for c in classes)
+                and (name is None or self.names[i] == name))
+
+    def select(self, selector_str):
+        """ use simple css selector string to query corresponding widgets """
+        conditions = self._parse(selector_str)
+        return (w for i, w in enumerate(self.widgets)
+                if any(self._match(i, *c) for c in conditions))
@@ -5,12 +5,16 @@
 __all__ =  [
     'register',
     'TkOutWidget',
+    'CompiledLayout',
+    'compile_layout',
+    'preload',
 ]
 
 
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from html.parser import HTMLParser
-from tkinter import Frame, Menu
+from tkinter import Entry, Frame, Menu, Misc, Spinbox
 from tkinter import ttk
 
 from jinja2 import Environment, Template
@@ -18,8 +22,18 @@ from lxml import etree
 from lxml.cssselect import CSSSelector
 import tinycss
 
-from . import settings
+from . import fonts, images, settings, tcl
 from .errors import *
+from .bindings import Bindings, parse_binding
+from .compact import CompactIndex
+from .dispatch import Dispatcher
+from .fields import ComputedField, Field
+from .options import GRID_SCHEMA, METHOD_SCHEMAS, SCHEMAS, Bool
+from .pool import WidgetPool
+from .reload import LayoutWatcher
+from .repeat import Repeat
+from .styles import ClassRules, is_stock_widget, ttk_style, widget_defaults, widget_options
+from .widgets import LayerCanvas
 
 
 def register(name):
@@ -88,14 +102,20 @@ class TkGridMgr:
 
 class TkOutElement(etree.ElementBase):
 
-    def init(self, tkoutw):
+    def init(self, tkoutw, data_context=None):
         # common attributes
         self.tkoutw = tkoutw
         self.widgets = tkoutw.widgets
         self.widget_type_counter = tkoutw.widget_type_counter
-        self.data_context = tkoutw.data_context
+        self.data_context = tkoutw.data_context if data_context is None else data_context
 
         self._widget = None
+        self._repeat = None
+        self._populated = False
+        self._data_command = None
+        self._handler_ids = []
+        self._bindtags = []
+        self._images = []
         self._name = None
         self._options = {}
         self._widget_method_options = {}
@@ -141,6 +161,9 @@ class TkOutElement(etree.ElementBase):
         elif self.is_in_gd and not self.can_in_gd:
             msg = 'tag <{}> should not be in tag <gd>'
             raise TagInWrongScope(msg.format(self.tag))
+        elif self.is_layer and not issubclass(self.getparent().widget_cls or object, LayerCanvas):
+            msg = 'tag <{}> should be in tag <canvas>'
+            raise TagInWrongScope(msg.format(self.tag))
 
     # option parsing
     def _handle_options(self, options):
@@ -156,14 +179,17 @@ class TkOutElement(etree.ElementBase):
         """
         modified_options = {}
         for name, value in options.items():
-            if value.startswith('{') and value.endswith('}'):
+            if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
                 value = value[1:-1].strip()
                 attrs = value.split('.')
                 dkey, *attrs = attrs
                 try:
                     data = self.data_context[dkey]
-                    for attr in attrs:
-                        if hasattr(data, attr):
+                    for i, attr in enumerate(attrs):
+                        # "{self.field.var}" gives the variable of the field
+                        if i < len(attrs) - 1 and isinstance(getattr(type(data), attr, None), Field):
+                            data = getattr(type(data), attr)
+                        elif hasattr(data, attr):
                             data = getattr(data, attr)
                         elif attr in data.__class__.__dict__:
                             data = data.__class__.__dict__[attr]
@@ -177,12 +203,82 @@ class TkOutElement(etree.ElementBase):
                 modified_options[name] = value
         return modified_options
 
-    def _parse_options(self):
+    def _option_items(self):
+        """ yield (method, option, value) of the tag attributes which are options
+        method is an empty string for the options of the widget itself.
+        """
         for attr, value in self.items():
-            if attr in ['name', 'type', 'class', 'id']:
+            if attr in ['name', 'type', 'class', 'id', 'lazy', 'propagate']:
+                continue
+            elif self.is_data_menu and attr in ['source', 'command']:
+                continue
+            elif self.is_repeat and attr in ['each', 'key', 'as', 'side']:
+                continue
+            method, _, attr = attr.partition('-') if '-' in attr else ('', '', attr)
+            yield method, attr, value
+
+    def _option_schema(self, method):
+        if not self.is_under_body or self.is_gr:
+            return None
+        elif self.is_gd:
+            return None if method else GRID_SCHEMA
+        elif method == 'bind':
+            return {}
+        elif method:
+            return METHOD_SCHEMAS.get(method)
+        return SCHEMAS.get(self.widget_cls)
+
+    def type_options(self, widgets, strict=True):
+        """ convert option values by the schema of the widget class
+        The typed values are kept in the element and used by _parse_options.
+        Return the problems found, unknown options are problems if strict.
+        """
+        self.widgets = widgets
+        self._typed = {}
+        return self._check_options(self._option_items(), strict, self._typed)
+
+    def check_declarations(self, declarations, strict=True):
+        """ problems of css declarations as options of the element, like
+        type_options finds for the options of the layout
+        """
+        items = []
+        for name, value in declarations.items():
+            method, _, attr = name.partition('-') if '-' in name else ('', '', name)
+            items.append((method, attr, value))
+        return self._check_options(items, strict, {})
+
+    def _check_options(self, items, strict, typed):
+        """ put the typed values of (method, option, value) items into typed
+        and return the problems found
+        """
+        problems = []
+        for method, attr, value in items:
+            schema = self._option_schema(method)
+            if schema is None:
+                continue
+            name = '{}-{}'.format(method, attr) if method else attr
+            if method == 'bind':
+                try:
+                    parse_binding(attr)
+                except ValueError as e:
+                    problems.append('option "{}": {}'.format(name, e))
+            elif not method and attr == 'src':
                 continue
-            elif '-' in attr:
-                method, _, attr  = attr.partition('-')
+            elif attr not in schema:
+                if strict:
+                    problems.append('unknown option "{}"'.format(name))
+            elif not (value.startswith('{') and value.endswith('}')):
+                try:
+                    typed[method, attr] = schema[attr].convert(value)
+                except ValueError as e:
+                    problems.append('option "{}": {}'.format(name, e))
+        return problems
+
+    def _parse_options(self):
+        typed = getattr(self, '_typed', {})
+        for method, attr, value in self._option_items():
+            value = typed.get((method, attr), value)
+            if method:
                 options = self._widget_method_options.setdefault(method, {})
                 options[attr] = value
             else:
@@ -195,19 +291,92 @@ class TkOutElement(etree.ElementBase):
                     self._options['root_attr'] = self.text.strip()
             elif self.is_under_body:
                 self._options['text'] = self.text.strip()
-        # handle options
+        # handle options, callbacks go through the dispatcher of tkouter widget
         self._options = self._handle_options(self._options)
+        for name, value in self._options.items():
+            if callable(value) and self._is_tk_option(name):
+                self._options[name] = self._dispatch(value)
         for method, options in self._widget_method_options.items():
             self._widget_method_options[method] = self._handle_options(options)
+        if 'src' in self._options:
+            self._acquire_image()
+        field = getattr(self._options.get('textvariable'), 'field', None)
+        if field is not None and 'validatecommand' not in self._options:
+            self._validate_by(field)
+        if isinstance(self._options.get('font'), str):
+            self._options['font'] = fonts.cache.name(self.tkoutw, self._options['font'])
+
+    def _acquire_image(self):
+        """ replace src by the image option given by the shared image cache """
+        src = self._options.pop('src')
+        options = self._widget_method_options.pop('src', {})
+        is_async = str(options.get('async', False)).lower() in Bool.TRUE
+        key, image = images.cache.acquire(self.tkoutw, src, options.get('size'),
+                                          options.get('format'), is_async)
+        self._images.append(key)
+        self._options['image'] = image
+
+    def _validate_by(self, field):
+        """ validate the text of an entry or spinbox by the constraints of its field """
+        if not issubclass(self.widget_cls or object, (Entry, Spinbox, ttk.Entry)):
+            return
+        command = field.validatecommand(self.tkoutw.tk)
+        if command is not None:
+            # focusout and changes of the variable check the complete value
+            self._options.setdefault('validate', 'all')
+            self._options['validatecommand'] = command
+
+    def _is_tk_option(self, name):
+        """ option is configured by tk, so a callable is given as a tcl command
+        Other options of custom widgets, like the formatter of <table>, take
+        the callable itself. Entries of menus take tk options only.
+        """
+        if not self.is_under_body or not self.has_widget_cls:
+            return True
+        stock_cls = next(cls for cls in self.widget_cls.__mro__ if is_stock_widget(cls))
+        return name in widget_options(stock_cls, self.tkoutw)[1]
+
+    def _dispatch(self, handler):
+        """ tcl command calling the handler through the dispatcher """
+        dispatcher = self.tkoutw.dispatcher
+        hid = dispatcher.add(handler, self.get('name') or self.tag)
+        self._handler_ids.append(hid)
+        return '{} {}'.format(dispatcher.name, hid)
+
+    def _bind(self):
+        for attr, handler in self._widget_method_options.get('bind', {}).items():
+            if not callable(handler):
+                msg = 'option "bind-{}" should be bound to a callable'
+                raise TagError(msg.format(attr))
+            tag = self.tkoutw.bindings.bind(self.widget, attr, handler, self.get('name') or self.tag)
+            self._bindtags.append(tag)
+
+    def release_resources(self):
+        """ release the handler ids, bindtags and images used by this element """
+        for hid in self._handler_ids:
+            self.tkoutw.dispatcher.release(hid)
+        for tag in self._bindtags:
+            self.tkoutw.bindings.release(tag)
+        for key in self._images:
+            images.cache.release(key)
+        self._handler_ids, self._bindtags, self._images = [], [], []
 
     def _init_pack_options(self):
         if self.is_under_body:
             pack_options = self._widget_method_options.setdefault('pack', {})
             if 'side' not in pack_options:
-                if self.getparent().is_body or self.getparent().is_notebook:
-                    pack_options['side'] = 'top'
-                elif self.getparent().is_side:
-                    pack_options['side'] = self.getparent().tag
+                side = self._default_side()
+                if side is not None:
+                    pack_options['side'] = side
+
+    def _default_side(self):
+        if self.getparent().is_body or self.getparent().is_notebook:
+            return 'top'
+        elif self.getparent().is_side:
+            return self.getparent().tag
+        elif self.getparent().is_repeat:
+            return self.getparent().get('side') or 'top'
+        return None
 
     def _init_grid_options(self):
         if self.is_gd:
@@ -216,8 +385,8 @@ class TkOutElement(etree.ElementBase):
             if 'row' not in self.grid_options:
                 self.grid_options['row'] = row = grid.index(gr)
             if 'column' not in self.grid_options:
-                rowspan = int(self.grid_options.get('rowspan', 1))
-                colspan = int(self.grid_options.get('columnspan', 1))
+                rowspan = self.grid_options.get('rowspan', 1)
+                colspan = self.grid_options.get('columnspan', 1)
                 col = self.gridmgr.get_column(row, rowspan, colspan)
                 self.grid_options['column'] = col
                 self.gridmgr.add_column(row, col, rowspan, colspan)
@@ -255,6 +424,14 @@ class TkOutElement(etree.ElementBase):
     def is_side(self):
         return self.tag in ['top', 'bottom', 'left', 'right']
 
+    @property
+    def is_repeat(self):
+        return self.tag == 'for'
+
+    @property
+    def is_layer(self):
+        return self.tag == 'layer'
+
     @property
     def is_grid(self):
         return self.tag == 'grid'
@@ -283,6 +460,46 @@ class TkOutElement(etree.ElementBase):
     def is_sub_menu(self):
         return self.is_menu and self.getparent().is_menu
 
+    @property
+    def is_lazy(self):
+        return self.get('lazy', '0').lower() not in ['0', 'false', '']
+
+    @property
+    def is_lazy_menu(self):
+        return self.is_sub_menu and (self.is_lazy or self.is_data_menu)
+
+    @property
+    def is_data_menu(self):
+        return self.is_sub_menu and self.get('source') is not None
+
+    @property
+    def is_container(self):
+        """ tag whose widget manages the geometry of child widgets """
+        if self.is_body:
+            return True
+        elif not self.is_under_body or self.is_grid_element or self.is_layer:
+            return False
+        return self.is_repeat or len(self) > 0
+
+    @property
+    def propagates(self):
+        return self.get('propagate', '1').lower() not in ['0', 'false']
+
+    @property
+    def is_lazy_container(self):
+        return self.is_lazy and self.is_under_body and self.is_container
+
+    @property
+    def is_deferred(self):
+        """ element is under a lazy menu or container which has not been built yet """
+        return any(not e._populated and (e.is_lazy_container or e.is_lazy_menu)
+                   for e in self.iterancestors())
+
+    @property
+    def is_pending(self):
+        """ widget of the element is not built yet because of laziness """
+        return (self.is_lazy_container and not self._populated) or self.is_deferred
+
     @property
     def is_notebook(self):
         return self.has_widget_cls and issubclass(self.widget_cls, ttk.Notebook)
@@ -316,6 +533,10 @@ class TkOutElement(etree.ElementBase):
     def is_in_gd(self):
         return self.getparent().is_gd
 
+    @property
+    def is_in_repeat(self):
+        return any(e.is_repeat for e in self.iterancestors())
+
     @property
     def can_under_head(self):
         return self.is_root_attr or self.is_link or self.is_menu or self.can_under_menu
@@ -326,7 +547,8 @@ class TkOutElement(etree.ElementBase):
 
     @property
     def can_under_body(self):
-        return (self.tag in self.widgets and not self.is_menu) or self.is_side or self.is_grid or self.is_grid_element
+        return ((self.tag in self.widgets and not self.is_menu) or self.is_side or self.is_grid
+                or self.is_grid_element or self.is_repeat or self.is_layer)
 
     @property
     def can_in_grid(self):
@@ -343,7 +565,8 @@ class TkOutElement(etree.ElementBase):
     # widget checker
     @property
     def has_no_widget_type(self):
-        return self.is_html or self.is_scope or self.is_root_attr or self.is_grid_element
+        return (self.is_html or self.is_scope or self.is_root_attr or self.is_grid_element
+                or self.is_layer)
 
     @property
     def has_widget_type(self):
@@ -374,7 +597,7 @@ class TkOutElement(etree.ElementBase):
     def widget_type(self):
         if self.has_no_widget_type:
             t = None
-        elif self.is_side or self.is_grid:
+        elif self.is_side or self.is_grid or self.is_repeat:
             t = self.get('type') or'frame'
         else:
             t = self.get('type') or self.tag
@@ -430,33 +653,327 @@ class TkOutElement(etree.ElementBase):
             assert(self.parent_widget)
             if self.is_under_body and not self.is_grid_element:
                 self._widget = self.widget_cls(self.parent_widget, **self._options)
-                setattr(self.tkoutw, self.widget_name, self._widget)
+                if not self.is_in_repeat:
+                    setattr(self.tkoutw, self.widget_name, self._widget)
             elif self.is_menu:
                 self._widget = self.widget_cls(self.parent_widget)
                 setattr(self.tkoutw, self.widget_name, self._widget)
         return self._widget
 
+    # repeat
+    def detach_template(self):
+        """ take the only child of <for> out of the tree as its template """
+        if len(self) != 1:
+            msg = 'tag <{}> should have exactly one child tag'
+            raise TagError(msg.format(self.tag))
+        self._template = self[0]
+        self.remove(self._template)
+
+    # runtime stylesheet
+    PACK_DEFAULTS = {'fill': 'none', 'expand': 0, 'anchor': 'center',
+                     'padx': 0, 'pady': 0, 'ipadx': 0, 'ipady': 0}
+
+    def restyle(self, declarations):
+        """ replace the css declarations applied to the element
+        Options are changed only where the declarations differ, and removed
+        ones go back to their defaults. Return the tcl commands configuring
+        the widget, which is left untouched if it is not built yet.
+        """
+        old, new = getattr(self, '_styled', {}), declarations
+        changed = {name for name in set(old) | set(new) if old.get(name) != new.get(name)}
+        for name in old:
+            if name not in new and name in self.attrib:
+                del self.attrib[name]
+        for name, value in new.items():
+            self.set(name, value)
+        self._styled = new
+        # values typed at compile time are stale, items of <for> share them
+        if getattr(self, '_typed', None):
+            self._typed = {key: value for key, value in self._typed.items()
+                           if ('-'.join(key) if key[0] else key[1]) not in changed}
+        # templates of <for> are not initialized, their items take the attributes
+        if not hasattr(self, '_options') or not self.creates_widget or self.widget_cls is None:
+            return []
+
+        options = widget_options(self.widget_cls, self.tkoutw)[1]
+        defaults = widget_defaults(self.widget_cls, self.tkoutw)
+        configure, pack = {}, {}
+        for name in list(old) + [name for name in new if name not in old]:
+            if name not in changed:
+                continue
+            value = new.get(name)
+            method, _, attr = name.partition('-') if '-' in name else ('', '', name)
+            if method == 'pack':
+                pack[attr] = value if value is not None else self._pack_default(attr)
+            elif method or attr not in options:
+                continue
+            elif value is None:
+                configure[attr] = defaults[attr]
+            else:
+                configure[attr] = fonts.cache.name(self.tkoutw, value) if attr == 'font' else value
+
+        self._options.update(configure)
+        if self.is_under_body:
+            self.pack_options.update(pack)
+        commands = []
+        if self._widget is not None and configure:
+            commands.append(tcl.command(self._widget._w, 'configure', **configure))
+        if self._widget is not None and pack and self._widget.winfo_manager() == 'pack':
+            commands.append(tcl.command('pack', 'configure', self._widget._w, **pack))
+        return commands
+
+    def _pack_default(self, attr):
+        if attr == 'side':
+            return self._default_side() or 'top'
+        return self.PACK_DEFAULTS.get(attr, '')
+
+    # lazy menu
+    def _post_menu(self):
+        """ populate the menu the first time it is opened """
+        if not self._populated:
+            self._populated = True
+            for e in self.iterdescendants():
+                e.display()
+            end = self.widget.index('end')
+            self._static_entries = 0 if end is None else end + 1
+            self._data_entries = None
+        if self.is_data_menu:
+            self._populate_data_menu()
+
+    def _populate_data_menu(self):
+        """ build the entries of a data-bound menu again if its source changed """
+        options = self._handle_options({'source': self.get('source'),
+                                        'command': self.get('command', '')})
+        entries = list(options['source'])
+        if entries == self._data_entries:
+            return
+        menu = self.widget
+        if self._data_entries:
+            menu.tk.call(menu._w, 'delete', self._static_entries, 'end')
+        if self._data_command is None:
+            self._data_command = self._dispatch(self._invoke_data_entry)
+        self._data_entries = entries
+        self._data_callback = options['command']
+        script = [tcl.command(menu._w, 'add', 'command', label=entry,
+                              command='{} {}'.format(self._data_command, i))
+                  for i, entry in enumerate(entries)]
+        menu.tk.eval('\n'.join(script))
+
+    def _invoke_data_entry(self, index):
+        if callable(self._data_callback):
+            self._data_callback(self._data_entries[int(index)])
+
+    # hot reload
+    @property
+    def signature(self):
+        """ compiled form of the element itself, children excluded """
+        signature = (self.tag, tuple(sorted(self.items())), (self.text or '').strip())
+        if self.is_repeat:
+            signature += (etree.tostring(self._template),)
+        return signature
+
+    @property
+    def creates_widget(self):
+        if self.is_html:
+            return False
+        return (self.is_under_body and not (self.is_grid_element or self.is_layer)) or self.is_menu
+
+    def adopt(self, old):
+        """ take over the widget and state of an unchanged old element """
+        self._widget = old._widget
+        self._repeat = old._repeat
+        self._bindtags, old._bindtags = old._bindtags, []
+        self._populated = old._populated
+        if self._repeat is not None:
+            self._repeat.element = self
+            for node in list(old):
+                self.append(node)
+
+    @property
+    def is_rebuild_unit(self):
+        if self.is_head or self.is_body:
+            return True
+        return self.creates_widget and self.is_under_body and not self.getparent().is_notebook
+
     # core function
     def display(self):
         if self.is_html or self.is_scope or self.is_link or self.is_grid_element:
             pass
         elif self.is_under_head:
-            if self.is_sub_menu:
+            if self.is_deferred:
+                pass
+            elif self.is_sub_menu:
                 self.parent_widget.add_cascade(menu=self.widget, **self._options)
+                if self.is_lazy_menu:
+                    self.widget['postcommand'] = self._dispatch(self._post_menu)
             elif self.is_under_menu:
                 self.parent_widget.add(itemType=self.widget_type, **self._options)
             elif self.is_top_menu:
                 self.parent_widget['menu'] = self.widget
+                self.tkoutw._menus.append(self.widget)
             elif self.is_root_attr:
                 func = getattr(self.parent_widget, self.tag)
                 func(self._options['root_attr'])
+        elif self.is_layer:
+            options = dict(self._options)
+            name = self.get('name') or 'layer{}'.format(self.getparent().index(self))
+            kind = options.pop('kind', 'line')
+            data = options.pop('data', ())
+            self.parent_widget.set_layer(name, kind, data, **options)
         elif self.is_under_body:
-            if self.is_in_gd:
-                self.widget.grid(**self.getparent().grid_options)
+            if self.is_deferred:
+                pass
+            elif self.is_lazy_container and not self._populated:
+                self.tkoutw._register_lazy(self)
             else:
-                self.widget.pack(**self.pack_options)
-            if self.getparent().is_notebook:
-                self.parent_widget.add(child=self.widget, text=self.widget_name)
+                # a lazy container is arranged only when it is materialized to show
+                if not self.is_lazy_container:
+                    self.arrange()
+                self._bind()
+                if self.is_repeat:
+                    self._repeat = Repeat(self)
+                    self._repeat.refresh()
+
+    def arrange(self):
+        """ put the widget into its parent by the layout """
+        if self.is_in_gd:
+            self.widget.grid(**self.getparent().grid_options)
+        else:
+            self.widget.pack(**self.pack_options)
+        if self.getparent().is_notebook:
+            self.parent_widget.add(child=self.widget, text=self.widget_name)
+
+
+# TkOutWidget subclass -> CompiledLayout given by preload
+_compiled_layouts = {}
+
+
+def _make_parser():
+    parser_lookup = etree.ElementDefaultClassLookup(element=TkOutElement)
+    parser = etree.XMLParser()
+    parser.set_element_class_lookup(parser_lookup)
+    return parser
+
+
+def _parse_template(template, context):
+    """ render the template into a tree of tkouter elements
+    Rendered chunks are parsed as they come, so the whole text is never kept.
+    """
+    parser = _make_parser()
+    for chunk in template.generate(context):
+        parser.feed(chunk)
+    return etree.ElementTree(parser.close())
+
+
+class CompiledLayout:
+    """ display independent result of compiling the layout of a widget class
+
+    It can be pickled to be sent between processes, the jinja templates and
+    the parsed stylesheet are left behind then. Each instantiate gives a new
+    tree for one widget, the tree built by compiling is handed out first.
+    """
+
+    def __init__(self, tree, proxy_cache, templates, class_rules, css=None, stylesheet=None):
+        self.templates = templates
+        self.class_rules = class_rules
+        self.css = css
+        self.stylesheet = stylesheet
+        self._tree = tree
+        self._proxy_cache = proxy_cache
+        self._xml = None
+        self._typed = None
+        self._styled = None
+
+    def __getstate__(self):
+        self._serialize()
+        state = dict(self.__dict__)
+        state.update(_tree=None, _proxy_cache=None, templates=[], stylesheet=None)
+        return state
+
+    def _serialize(self):
+        if self._xml is None:
+            self._xml = etree.tostring(self._tree)
+            self._typed = [getattr(e, '_typed', {}) for e in self._proxy_cache]
+            self._styled = [getattr(e, '_styled', {}) for e in self._proxy_cache]
+
+    def instantiate(self, parser=None):
+        """ return the cascaded tree and the cache of its element proxies """
+        if self._tree is not None:
+            tree, proxy_cache = self._tree, self._proxy_cache
+            self._tree = self._proxy_cache = None
+            return tree, proxy_cache
+        tree = etree.ElementTree(etree.fromstring(self._xml, parser or _make_parser()))
+        proxy_cache = list(tree.getroot().iter())
+        for e, typed, styled in zip(proxy_cache, self._typed, self._styled):
+            if typed:
+                e._typed = typed
+            if styled:
+                e._styled = dict(styled)
+        return tree, proxy_cache
+
+
+def compile_layout(widget):
+    """ render, parse, cascade and type the layout of a tkouter widget class
+    or instance without any tk work, return a CompiledLayout
+    """
+    env = Environment(loader=widget.loader)
+    templates = []
+    if '.html' in widget.layout or 'xml' in widget.layout:
+        template = env.get_template(widget.layout)
+        templates.append(template)
+    else:
+        template = Template(widget.layout)
+
+    tree = _parse_template(template, widget.context)
+
+    # we should cache the elements for storing data to it
+    proxy_cache = list(tree.getroot().iter())
+
+    # css, rules of a bare tag are kept for the whole widget class
+    css = stylesheet = None
+    class_rules = ClassRules(tree.getroot(), widget.widgets)
+    for link in tree.getroot().iter():
+        if link.is_css and link.get('href'):
+            template = env.get_template(link.get('href'))
+            templates.append(template)
+            css = template.render()
+            stylesheet = tinycss.make_parser().parse_stylesheet(css)
+            for rule in stylesheet.rules:
+                if class_rules.add(rule):
+                    continue
+                for e in CSSSelector(rule.selector.as_css())(tree.getroot()):
+                    styled = e.__dict__.setdefault('_styled', {})
+                    for d in rule.declarations:
+                        if e.get(d.name) is None:
+                            e.set(d.name, d.value.as_css())
+                            styled[d.name] = d.value.as_css()
+
+    # option values are typed once here, all problems are reported together
+    problems = []
+    for e in proxy_cache:
+        for problem in e.type_options(widget.widgets, widget.strict_options):
+            problems.append('line {}: <{}> {}'.format(e.sourceline, e.tag, problem))
+    # class rules go to the option database instead of the elements
+    problems.extend(class_rules.type_options(widget.widgets, widget.strict_options))
+    if problems:
+        raise OptionError('invalid options in layout\n' + '\n'.join(problems))
+
+    return CompiledLayout(tree, proxy_cache, templates, class_rules, css, stylesheet)
+
+
+def preload(classes, workers=None):
+    """ compile the layouts of tkouter widget classes in a process pool
+
+    Widgets of these classes are built from the compiled layouts afterwards,
+    so only the tk work is left on the main thread. Layouts are compiled with
+    the class attributes, classes rendering their layout from instance
+    attributes should not be preloaded.
+    workers is the number of processes, default to the number of cpus.
+    """
+    classes = [cls for cls in classes if cls.layout]
+    with ProcessPoolExecutor(workers) as executor:
+        for cls, compiled in zip(classes, executor.map(compile_layout, classes)):
+            _compiled_layouts[cls] = compiled
 
 
 class TkOutWidget(Frame):
@@ -470,12 +987,29 @@ class TkOutWidget(Frame):
     - layout: layout html(xml) or layout-html(xml) file name (string)
     - context: used to render the layout if it is a template (dictionary)
     - data_context: used to query the data when building a widget. (dictionary)
+    - autoreload: watch the layout files and reload on change (bool)
+    - pool_size: max number of idle widgets kept by the widget pool (int)
+    - compact: release the layout tree after build to save memory (bool)
+    - strict_options: report unknown options of stock widgets (bool)
+    - suspend_propagation: turn off geometry propagation while building (bool)
+    - profile_handlers: time the callbacks bound in the layout (bool)
+    - slow_handler: milliseconds above which a callback is reported slow (number)
+
+    Containers in body with lazy="1" are built only when one of their widgets
+    is first used as an attribute, or by materialize.
     """
     widgets = settings.WIDGETS
     loader = settings.LOADER
     layout = None
     context = {}
     data_context = None
+    autoreload = False
+    pool_size = 64
+    compact = False
+    strict_options = True
+    suspend_propagation = True
+    profile_handlers = False
+    slow_handler = 50
 
     def __init__(self, parent):
         super().__init__(parent)
@@ -483,51 +1017,450 @@ class TkOutWidget(Frame):
         if self.data_context is None:
             self.data_context = {'self': self}
         self.widget_type_counter = {}
+        self._watcher = None
+        self._menus = []
+        # widget name -> lazy container element building it
+        self._lazy = {}
+        self.pool = WidgetPool(self.pool_size)
+        self.dispatcher = Dispatcher(self)
+        if self.profile_handlers:
+            self.dispatcher.enable_profiling(self.slow_handler)
+        self.bindings = Bindings(self)
+        # computed fields of the class are computed for this widget
+        for field in self._computed_fields():
+            field.bind(self)
         self._build()
+        if self.autoreload and self.layout:
+            self.watch()
+
+    def destroy(self):
+        """ destroy the widget and release everything created by its layout
+
+        Menus live in the parent, so they are destroyed here together with
+        the tcl commands of their entries. Elements drop their references to
+        this widget, the layout tree is released and computed fields bound to
+        this widget are unbound, so nothing keeps the python objects or
+        interpreter state of the layout alive.
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self.pool.clear()
+        # bindings release their handler ids
+        self.bindings.clear()
+        self.dispatcher.clear()
+        for menu in self._menus:
+            if str(self.parent['menu']) == str(menu):
+                self.parent['menu'] = ''
+            menu.destroy()
+        self._menus = []
+        self._release_layout()
+        for field in self._computed_fields():
+            field.unbind(self)
+        super().destroy()
+
+    def _computed_fields(self):
+        return [value for cls in type(self).__mro__ for value in vars(cls).values()
+                if isinstance(value, ComputedField)]
+
+    def __getattr__(self, name):
+        # only called for missing attributes, like widgets of lazy containers
+        lazy = self.__dict__.get('_lazy')
+        if lazy and name in lazy and not lazy[name]._populated:
+            return self.materialize(name)
+        msg = "'{}' object has no attribute '{}'"
+        raise AttributeError(msg.format(type(self).__name__, name))
+
+    def _register_lazy(self, e):
+        """ widgets of a lazy container are built when they are first used """
+        for d in e.iter():
+            if d.creates_widget:
+                self._lazy[d.widget_name] = e
+
+    def materialize(self, name, show=False):
+        """ build the lazy container holding the widget of the given name
+        Lazy containers nested in it are built down to the one holding the
+        widget, and shown in their places of the layout.
+        The outermost built container is shown in its place of the layout if
+        show is True, otherwise it is left to be packed or gridded by the user.
+        Return the widget of the name.
+        """
+        built = []
+        # building a container registers the lazy containers nested in it
+        while not self._lazy[name]._populated:
+            e = self._lazy[name]
+            e._populated = True
+            with self._suspended_propagation() as suspend:
+                for d in list(e.iter()):
+                    with self._tag_error_report(d):
+                        suspend(d)
+                        d.display()
+            built.append(e)
+        for e in built[1:]:
+            e.arrange()
+            self._keep_pack_order(e)
+        if show:
+            e = built[0] if built else self._lazy[name]
+            e.arrange()
+            self._keep_pack_order(e)
+        return getattr(self, name)
+
+    def _release_layout(self):
+        elements = list(self.__dict__.get('_proxy_cache', []))
+        if '_tree' in self.__dict__:
+            elements.extend(self._tree.getroot().iter())
+        image_keys = self.__dict__.pop('_image_keys', [])
+        for e in elements:
+            if isinstance(e, TkOutElement):
+                image_keys.extend(getattr(e, '_images', []))
+                vars(e).clear()
+        # images are shared by other widgets through the cache
+        for key in image_keys:
+            images.cache.release(key)
+        for attr in ['_tree', '_parser', '_css', '_stylesheet', '_proxy_cache',
+                     '_templates', '_class_rules', '_index', '_lazy']:
+            self.__dict__.pop(attr, None)
+        # attributes assigned to the widgets of layout
+        for name, value in list(vars(self).items()):
+            if isinstance(value, Misc) and name not in ['master', 'parent']:
+                delattr(self, name)
 
     def _build(self):
         """ create layout and define widget attribute by tkouter html """
         if not self.layout:
             return
 
-        env = Environment(loader=self.loader)
-        if '.html' in self.layout or 'xml' in self.layout:
-            template = env.get_template(self.layout)
-            self._html = template.render(self.context)
-        else:
-            self._html = Template(self.layout).render(self.context)
-
-        # lxml parser
-        parser_lookup = etree.ElementDefaultClassLookup(element=TkOutElement)
-        self._parser = etree.XMLParser()
-        self._parser.set_element_class_lookup(parser_lookup)
-        self._tree = etree.parse(StringIO(self._html), self._parser)
-
-        # we should cache the elements for storing data to it
-        self._proxy_cache = list(self._tree.getroot().iter())
-
-        # css
-        css = None
-        for e in self._tree.getroot().iter():
-            if e.is_css and e.get('href'):
-                self._css = env.get_template(e.get('href')).render()
-                self._css_parser = tinycss.make_parser()
-                self._stylesheet = self._css_parser.parse_stylesheet(self._css)
-                for rule in self._stylesheet.rules:
-                    for e in self._select(rule.selector.as_css()):
-                        for d in rule.declarations:
-                            if e.get(d.name) is None:
-                                e.set(d.name, d.value.as_css())
-
-        # post init etree elements and display their widgets
-        for e in self._tree.getroot().iter():
-            try:
+        self._compile()
+        self._class_rules.install(self, self._proxy_cache)
+
+        # post init etree elements and display their widgets, lazy containers
+        # register the names of their descendants so all are initialized first
+        elements = list(self._tree.getroot().iter())
+        for e in elements:
+            with self._tag_error_report(e):
                 e.init(self)
-                e.display()
-            except TagError as err:
-                print('Error when parsing tag: ')
-                print(etree.tostring(e, pretty_print=True, encoding=str, method='html'))
-                raise err
+        with self._suspended_propagation() as suspend:
+            for e in elements:
+                with self._tag_error_report(e):
+                    suspend(e)
+                    e.display()
+
+        if self.compact:
+            self._compact()
+
+    def _compile(self, cached=True):
+        """ compile the layout or take the one compiled by preload
+
+        Nothing is assigned to the widget unless the whole layout compiles, so
+        a broken layout leaves the current one untouched.
+        A widget with autoreload compiles itself to watch its templates.
+        """
+        self.__dict__.update(self._instantiate(cached))
+
+    def _instantiate(self, cached=True):
+        """ compile the layout and return the attributes of its new tree """
+        compiled = _compiled_layouts.get(type(self)) if cached and not self.autoreload else None
+        if compiled is None:
+            compiled = compile_layout(self)
+        parser = _make_parser()
+        tree, proxy_cache = compiled.instantiate(parser)
+
+        # templates of <for> are built at runtime, nested ones by their repeat
+        repeats = [e for e in tree.getroot().iter('for') if not e.is_in_repeat]
+        for e in repeats:
+            e.detach_template()
+
+        state = {
+            '_parser': parser,
+            '_tree': tree,
+            '_proxy_cache': proxy_cache,
+            '_templates': compiled.templates,
+            '_class_rules': compiled.class_rules,
+        }
+        if compiled.css is not None:
+            state.update(_css=compiled.css, _stylesheet=compiled.stylesheet)
+        return state
+
+    @contextmanager
+    def _suspended_propagation(self):
+        """ turn off geometry propagation of containers while building them
+
+        Otherwise every packed or gridded child makes its containers compute
+        their requested size again up to the top level. Propagation is
+        restored bottom-up at the end, which schedules one geometry pass.
+        A container with propagate="0" keeps propagation off.
+        """
+        suspended = []
+
+        def suspend(e):
+            if e.is_html or not e.is_container or e.is_pending or not (self.suspend_propagation or not e.propagates):
+                return
+            widget = self if e.is_body else e.widget
+            widget.pack_propagate(False)
+            widget.grid_propagate(False)
+            suspended.append((widget, e.propagates))
+
+        try:
+            yield suspend
+        finally:
+            for widget, propagates in reversed(suspended):
+                if propagates:
+                    widget.pack_propagate(True)
+                    widget.grid_propagate(True)
+
+    def _compact(self):
+        """ release the compiled layout and keep only an index for select """
+        if any(e._repeat is not None for e in self._tree.getroot().iter('for')):
+            raise CompactModeError('tag <for> is not supported in compact mode')
+        if self._lazy:
+            raise CompactModeError('lazy containers are not supported in compact mode')
+        # menus posted later populate themselves from their elements
+        if any(e.is_lazy_menu for e in self._tree.getroot().iter('menu')):
+            raise CompactModeError('lazy and data menus are not supported in compact mode')
+        self._index = CompactIndex(self._tree.getroot().iter())
+        self._image_keys = [key for e in self._tree.getroot().iter()
+                            for key in getattr(e, '_images', [])]
+        for attr in ['_tree', '_parser', '_css', '_stylesheet',
+                     '_proxy_cache', '_templates', '_class_rules']:
+            self.__dict__.pop(attr, None)
+
+    def _check_not_compact(self, operation):
+        if self.compact:
+            msg = '{} is not available in compact mode'
+            raise CompactModeError(msg.format(operation))
+
+    @contextmanager
+    def _tag_error_report(self, e):
+        try:
+            yield
+        except TagError as err:
+            print('Error when parsing tag: ')
+            print(etree.tostring(e, pretty_print=True, encoding=str, method='html'))
+            raise err
+
+    def watch(self, interval=500):
+        """ poll the layout and stylesheet files and reload on change """
+        self._check_not_compact('watch')
+        if self._watcher is None:
+            self._watcher = LayoutWatcher(self, interval)
+        self._watcher.start()
+        return self._watcher
+
+    def reload(self):
+        """ recompile the layout and rebuild the subtrees which changed
+
+        Widgets of unchanged subtrees are kept as they are, so their state and
+        the values of bound fields survive the reload.
+        Return the number of rebuilt subtrees.
+        """
+        self._check_not_compact('reload')
+        # old proxies must stay alive to keep the state stored on them
+        old_root, old_cache = self._tree.getroot(), self._proxy_cache
+        old_class_rules = self._class_rules
+
+        # the new tree is checked before anything of the running layout changes
+        state = self._instantiate(cached=False)
+        new_root, new_cache = state['_tree'].getroot(), state['_proxy_cache']
+        counter = self.widget_type_counter
+        # names must be assigned in document order just like a fresh build
+        self.widget_type_counter = {}
+        try:
+            state['_class_rules'].apply(self, new_cache)
+            for e in new_root.iter():
+                with self._tag_error_report(e):
+                    e.init(self)
+                    if e.creates_widget:
+                        e.widget_name
+        except Exception:
+            for e in new_cache:
+                if getattr(e, '_handler_ids', None) is not None:
+                    e.release_resources()
+            self.widget_type_counter = counter
+            raise
+
+        self.__dict__.update(state)
+        self._class_rules.configure(self, old_class_rules)
+        restyled = self._class_rules.changed_tags(old_class_rules)
+        for e in old_root.iter():
+            if e._name is not None and self.__dict__.get(e._name) is e._widget:
+                delattr(self, e._name)
+
+        kept, units = [], []
+        if self._diff(old_root, new_root, kept, units, restyled):
+            kept = []
+            units = [(old_root.find('head'), new_root.find('head')),
+                     (old_root.find('body'), new_root.find('body'))]
+        for old, new in kept:
+            new.adopt(old)
+            if new.has_widget_name and new._widget is not None:
+                setattr(self, new.widget_name, new._widget)
+        self._lazy = {}
+        for e in new_root.iter():
+            if e.is_lazy_container and not e.is_deferred:
+                self._register_lazy(e)
+
+        # later units first, so each rebuilt widget can be packed before an
+        # already placed next sibling
+        for old, new in reversed(units):
+            self._rebuild(old, new)
+
+        # kept widgets call the same handler ids, which new elements hold now
+        for e in old_cache:
+            if getattr(e, '_handler_ids', None) is not None:
+                e.release_resources()
+        return len(units)
+
+    def _diff(self, old, new, kept, units, restyled):
+        """ compare two compiled subtrees
+        Elements with restyled tags changed through their css class rules.
+        Unchanged elements go to kept and changed rebuild units go to units.
+        Return True if the change should be handled by an ancestor.
+        """
+        kept_mark, units_mark = len(kept), len(units)
+        changed = old.signature != new.signature or new.tag in restyled
+        # children of <for> are items managed by its repeat
+        if not changed and not new.is_repeat:
+            changed = len(old) != len(new)
+            for o, n in zip(old, new):
+                changed = self._diff(o, n, kept, units, restyled) or changed
+        if not changed:
+            kept.append((old, new))
+            return False
+        del kept[kept_mark:]
+        del units[units_mark:]
+        if new.is_rebuild_unit:
+            units.append((old, new))
+            return False
+        return True
+
+    def _rebuild(self, old, new):
+        """ destroy the widgets of old subtree and build the new one """
+        if old is not None:
+            if old.is_head or old.is_body:
+                olds = [e for e in old if e._widget is not None]
+            else:
+                olds = [old] if old._widget is not None else []
+            for e in olds:
+                if e.is_top_menu:
+                    self.parent['menu'] = ''
+                    self._menus.remove(e._widget)
+                e._widget.destroy()
+        if new is None:
+            return
+        with self._suspended_propagation() as suspend:
+            for e in list(new.iter()):
+                with self._tag_error_report(e):
+                    suspend(e)
+                    e.display()
+        self._keep_pack_order(new)
+
+    def _keep_pack_order(self, e):
+        """ pack the widget before its next packed sibling like a fresh build """
+        if e.is_under_body and not e.is_in_gd and e._widget is not None:
+            for sibling in e.itersiblings():
+                if sibling._widget is not None and sibling._widget.winfo_manager() == 'pack':
+                    e._widget.pack_configure(before=sibling._widget)
+                    break
+
+    def refresh(self, name=None):
+        """ rebuild the changed items of <for> tags after their collections change
+        Only the <for> tag with the given name is refreshed if name is given.
+        """
+        self._check_not_compact('refresh')
+        repeats = [e._repeat for e in self._tree.getroot().iter('for') if e._repeat is not None]
+        for repeat in repeats:
+            if repeat.is_alive and (name is None or repeat.element.widget_name == name):
+                repeat.refresh()
+
+    def apply_stylesheet(self, css):
+        """ switch to another stylesheet without rebuilding the widget
+
+        The cascade is computed again against the current layout tree, and
+        only options whose values changed are configured, all by one tcl
+        script. Inline options in the layout still win over the stylesheet.
+        Declarations are checked like at build before anything changes, and
+        problems are reported by OptionError.
+        Return the number of widgets configured.
+        """
+        self._check_not_compact('apply_stylesheet')
+        stylesheet = tinycss.make_parser().parse_stylesheet(css)
+        # the cascade of compile_layout: the first rule setting an option
+        # wins, and class rules only fill in what other rules left
+        class_rules = self._class_rules.empty()
+        rules = [(CSSSelector(rule.selector.as_css()), rule.declarations)
+                 for rule in stylesheet.rules if not class_rules.add(rule)]
+        root = self._tree.getroot()
+        cascaded = self._cascade(root, rules)
+        elements = [e for e in root.iterdescendants()
+                    if isinstance(e, TkOutElement) and e.is_under_body]
+
+        # templates of <for> give the declarations of items built later, they
+        # are matched and checked in their place but apart from the items
+        repeats = [e for e in root.iter('for') if getattr(e, '_template', None) is not None]
+        templates = [t for e in repeats for t in e._template.iter() if isinstance(t, TkOutElement)]
+        problems, inlines = [], {}
+        for e in repeats:
+            e.insert(0, e._template)
+        try:
+            matched = self._cascade(root, rules) if repeats else {}
+            cascaded.update((t, matched[t]) for t in templates if t in matched)
+            elements.extend(templates)
+            # options of the other rules are checked like the options of the layout
+            for e in elements:
+                old = getattr(e, '_styled', {})
+                inlines[e] = {name for name in e.keys() if name not in old}
+                declarations = {name: value for name, value in cascaded.get(e, {}).items()
+                                if name not in inlines[e]}
+                for problem in e.check_declarations(declarations, self.strict_options):
+                    problem = 'line {}: <{}> {}'.format(e.sourceline, e.tag, problem)
+                    if problem not in problems:
+                        problems.append(problem)
+        finally:
+            for e in repeats:
+                e.remove(e._template)
+        problems.extend(class_rules.type_options(self.widgets, self.strict_options))
+        if problems:
+            raise OptionError('invalid options in stylesheet\n' + '\n'.join(problems))
+
+        script, configured = [], 0
+        class_styles = class_rules.styles(self)
+        for e in elements:
+            inline = inlines[e]
+            new = {name: value for name, value in cascaded.get(e, {}).items() if name not in inline}
+            # class rules give covered elements the options of the build,
+            # like the style of ttk widgets
+            if e.tag in class_styles:
+                widget_cls, declarations, _, covered = class_styles[e.tag]
+                if self.widgets.get(e.widget_type) is widget_cls:
+                    declarations = covered
+                for name, value in declarations.items():
+                    if name not in inline:
+                        new.setdefault(name, value)
+            if new == getattr(e, '_styled', {}):
+                continue
+            commands = e.restyle(new)
+            script.extend(commands)
+            configured += bool(commands)
+        # widgets built later, like new items of <for>, only see the new rules
+        class_rules.configure(self, self._class_rules)
+        self._class_rules = class_rules
+        if script:
+            self.tk.eval('\n'.join(script))
+        self._css, self._stylesheet = css, stylesheet
+        return configured
+
+    @staticmethod
+    def _cascade(root, rules):
+        """ declarations of the elements matched by the (selector, declarations)
+        rules, the first rule setting an option wins
+        """
+        cascaded = {}
+        for selector, declarations in rules:
+            for e in selector(root):
+                options = cascaded.setdefault(e, {})
+                for d in declarations:
+                    options.setdefault(d.name, d.value.as_css())
+        return cascaded
 
     def _select(self, selector_str):
         """ use css selector string to query corresponding etree elements """
@@ -536,4 +1469,7 @@ class TkOutWidget(Frame):
 
     def select(self, selector_str):
         """ use css selector string to query corresponding widgets """
-        return (e.widget for e in self._select(selector_str) if e.widget is not None)
\ No newline at end of file
+        if self.compact:
+            return self._index.select(selector_str)
+        return (e.widget for e in self._select(selector_str)
+                if not e.is_pending and e.widget is not None)
\ No newline at end of file
@@ -0,0 +1,238 @@
+""" Module contains the dispatcher of callbacks bound in layouts
+"""
+
+__all__ = [
+    'Histogram',
+    'HandlerStats',
+    'Dispatcher',
+]
+
+
+from collections import deque
+from math import log2
+from time import perf_counter
+
+
+class Histogram:
+    """ latency histogram with logarithmic buckets
+
+    Each doubling of the latency is split into 4 buckets, so percentiles are
+    given within 19% of the recorded latencies, whatever their number.
+    """
+
+    STEPS = 4
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # bucket -> number of latencies
+        self._buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        microseconds = seconds * 1e6
+        bucket = int(log2(microseconds) * self.STEPS) if microseconds > 1 else 0
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, p):
+        """ upper bound of the bucket holding the p-th percentile in seconds """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                break
+        return min(2 ** ((bucket + 1) / self.STEPS) / 1e6, self.max)
+
+
+class HandlerStats:
+    """ calls of one handler recorded by the dispatcher """
+
+    def __init__(self, name, hid):
+        self.name = name
+        self.hid = hid
+        self.sources = set()
+        self.histogram = Histogram()
+        self.slow = 0
+
+    def summary(self):
+        """ dictionary of the statistics, latencies in milliseconds """
+        histogram = self.histogram
+        return {
+            'handler': self.name,
+            'id': self.hid,
+            'sources': sorted(self.sources),
+            'calls': histogram.count,
+            'slow': self.slow,
+            'total': histogram.total * 1000,
+            'p50': histogram.percentile(50) * 1000,
+            'p95': histogram.percentile(95) * 1000,
+            'p99': histogram.percentile(99) * 1000,
+            'max': histogram.max * 1000,
+        }
+
+
+class Dispatcher:
+    """ route the callbacks bound in a layout through one tcl command
+
+    tkinter registers a new tcl command for every callable option, even if
+    hundreds of buttons bind the same method. A tkouter widget registers only
+    its dispatcher instead, and each callable option becomes the command of
+    the dispatcher followed by the id of the handler. Arguments appended by
+    tk are passed on to the handler.
+    Equal handlers share one id. Ids are reference counted, so ids of widgets
+    destroyed at runtime are reused.
+    When profiling is enabled, calls are timed per handler id, so different
+    handlers with the same name are not merged, and a call slower than the
+    threshold generates <<TkOutSlowHandler>> on the widget, with the call
+    recorded in slow_calls. Disabled profiling costs one comparison.
+    Statistics of a released id are kept apart from those of its next handler.
+    """
+
+    SLOW_EVENT = '<<TkOutSlowHandler>>'
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.name = widget.register(self.dispatch)
+        # handler id -> HandlerStats, None when profiling is disabled
+        self.stats = None
+        # HandlerStats of released handler ids
+        self._released_stats = []
+        self.slow_threshold = None
+        # (handler name, milliseconds) of the recent slow calls
+        self.slow_calls = deque(maxlen=100)
+        self.handlers = []
+        # handler id -> names of the tags binding it
+        self.sources = {}
+        self._ids = {}
+        self._refs = []
+        self._free = []
+
+    def __len__(self):
+        return len(self.handlers) - len(self._free)
+
+    def add(self, handler, source=None):
+        """ return the id of the handler """
+        try:
+            hid = self._ids.get(handler)
+        except TypeError:
+            hid = None
+        if hid is None:
+            if self._free:
+                hid = self._free.pop()
+                self.handlers[hid] = handler
+                self._refs[hid] = 0
+            else:
+                hid = len(self.handlers)
+                self.handlers.append(handler)
+                self._refs.append(0)
+            try:
+                self._ids[handler] = hid
+            except TypeError:
+                pass
+            self.sources[hid] = set()
+        self._refs[hid] += 1
+        if source is not None:
+            self.sources[hid].add(source)
+        return hid
+
+    def command(self, handler, source=None):
+        """ tcl command which calls the handler """
+        return '{} {}'.format(self.name, self.add(handler, source))
+
+    def release(self, hid):
+        """ drop one reference of the handler id """
+        self._refs[hid] -= 1
+        if self._refs[hid] == 0:
+            handler = self.handlers[hid]
+            try:
+                if self._ids.get(handler) == hid:
+                    del self._ids[handler]
+            except TypeError:
+                pass
+            self.handlers[hid] = None
+            del self.sources[hid]
+            self._free.append(hid)
+            if self.stats is not None and hid in self.stats:
+                self._released_stats.append(self.stats.pop(hid))
+
+    def clear(self):
+        self.handlers, self.sources, self._ids, self._refs, self._free = [], {}, {}, [], []
+        if self.stats is not None:
+            self._released_stats.extend(self.stats.values())
+            self.stats = {}
+
+    def dispatch(self, hid, *args):
+        if self.stats is None:
+            return self.handlers[int(hid)](*args)
+        return self._timed(int(hid), args)
+
+    def enable_profiling(self, slow=None):
+        """ time the calls of handlers, slow is the threshold in milliseconds """
+        if self.stats is None:
+            self.stats = {}
+        self.slow_threshold = slow
+
+    def disable_profiling(self):
+        """ stop timing calls and drop the statistics """
+        self.stats = None
+        self._released_stats = []
+        self.slow_calls.clear()
+
+    def _timed(self, hid, args):
+        handler = self.handlers[hid]
+        start = perf_counter()
+        try:
+            return handler(*args)
+        finally:
+            elapsed = perf_counter() - start
+            self._record(hid, handler, elapsed)
+
+    def _record(self, hid, handler, elapsed):
+        if self.stats is None:
+            # the handler disabled profiling or destroyed the widget
+            return
+        if hid < len(self.handlers) and self.handlers[hid] is handler:
+            stats = self.stats.get(hid)
+            if stats is None:
+                stats = self.stats[hid] = HandlerStats(self._name(handler), hid)
+        else:
+            # the handler released its own id, like a button removing its row
+            stats = next((stats for stats in reversed(self._released_stats) if stats.hid == hid), None)
+            if stats is None or stats.name != self._name(handler):
+                stats = HandlerStats(self._name(handler), hid)
+                self._released_stats.append(stats)
+        name = stats.name
+        stats.sources.update(self.sources.get(hid, ()))
+        stats.histogram.add(elapsed)
+        milliseconds = elapsed * 1000
+        if self.slow_threshold is not None and milliseconds > self.slow_threshold:
+            stats.slow += 1
+            self.slow_calls.append((name, milliseconds))
+            if self.widget.winfo_exists():
+                self.widget.event_generate(self.SLOW_EVENT)
+
+    @staticmethod
+    def _name(handler):
+        return getattr(handler, '__qualname__', None) or repr(handler)
+
+    def report(self):
+        """ summaries of the profiled handlers, the most time consuming first """
+        if self.stats is None:
+            return []
+        summaries = [stats.summary() for stats in self._released_stats + list(self.stats.values())]
+        return sorted(summaries, key=lambda summary: -summary['total'])
+
+    def format_report(self):
+        """ report as a text table """
+        header = '{:<40} {:>7} {:>5} {:>9} {:>8} {:>8} {:>8} {:>8}'
+        row = '{handler:<40} {calls:>7} {slow:>5} {total:>9.1f} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {max:>8.2f}'
+        lines = [header.format('handler', 'calls', 'slow', 'total ms', 'p50', 'p95', 'p99', 'max')]
+        lines.extend(row.format(**summary) for summary in self.report())
+        return '\n'.join(lines)
@@ -7,6 +7,9 @@ __all__ = [
     'TagUnRecognizedError',
     'DataNotExistError',
     'TagInWrongScope',
+    'OptionError',
+    'RepeatKeyError',
+    'CompactModeError',
 ]
 
 
@@ -23,4 +26,13 @@ class DataNotExistError(TagError):
     """ can not find the data specified in tag from data_context. """
 
 class TagInWrongScope(TagError):
-    """ tag in wrong scope """
\ No newline at end of file
+    """ tag in wrong scope """
+
+class OptionError(TagError):
+    """ options of tags in layout html are unknown or invalid """
+
+class RepeatKeyError(Error):
+    """ items of a <for> tag do not have unique keys """
+
+class CompactModeError(Error):
+    """ operation needs the layout tree which is released in compact mode """
\ No newline at end of file
@@ -2,82 +2,350 @@
 """
 
 __all__ = [
+    'Field',
     'StringField',
     'BoolField',
     'IntField',
+    'ComputedField',
 ]
 
 
-from tkinter import StringVar, BooleanVar, IntVar
+import re
+from tkinter import StringVar, BooleanVar, IntVar, TclError
 
+from . import tcl
 
-class StringField:
-    """ basic field which is implemented by StringVar
+
+# tcl procs checking the text of entries bound to fields on every key, when
+# they lose focus and when the variable changes, the text is checked inside
+# tcl without calling back into python
+VALIDATE_PROCS = r"""
+namespace eval ::tkouter {}
+proc ::tkouter::validate {check widget mode reason value} {
+    set valid [{*}$check $reason $value]
+    # tk turns validation off when a change of the variable is rejected
+    if {!$valid && $reason eq "forced"} {
+        after idle [list $widget configure -validate $mode]
+    }
+    return $valid
+}
+proc ::tkouter::validate_string {maxlength pattern reason value} {
+    if {$maxlength ne "" && [string length $value] > $maxlength} {return 0}
+    if {$pattern ne "" && ![regexp -- "^(?:$pattern)\$" $value]} {return 0}
+    return 1
+}
+proc ::tkouter::validate_int {min max reason value} {
+    set typing [expr {$reason in {key focusin}}]
+    if {$typing && ($value eq "" || ($value eq "-" && ($min eq "" || $min < 0)))} {return 1}
+    # decimal digits only, without leading zeros or a plus sign
+    if {![regexp {^-?(?:0|[1-9][0-9]*)$} $value] || $value eq "-0"} {return 0}
+    if {!$typing} {
+        return [expr {($min eq "" || $value >= $min) && ($max eq "" || $value <= $max)}]
+    }
+    if {$value == 0} {
+        return [expr {($min eq "" || 0 >= $min) && ($max eq "" || 0 <= $max)}]
+    }
+    # more digits give magnitudes in [lo, hi], which grows tenfold per digit
+    if {$value > 0} {
+        set low $min
+        set high $max
+    } else {
+        set low [expr {$max eq "" ? "" : -$max}]
+        set high [expr {$min eq "" ? "" : -$min}]
+    }
+    set lo [set hi [expr {abs($value)}]]
+    while {$high eq "" || $lo <= $high} {
+        if {$low eq "" || $hi >= $low} {return 1}
+        set lo [expr {$lo * 10}]
+        set hi [expr {$hi * 10 + 9}]
+    }
+    return 0
+}
+"""
+
+# interpreters which have the validate procs
+_validating = set()
+
+# computed fields being computed, the innermost last
+_computing = []
+# interpreter -> computed fields waiting to push their values to their
+# variables, an interpreter is in it while its flush is scheduled
+_dirty = {}
+
+
+class Field:
+    """ base of fields, the value is kept in a tk variable shared by widgets
+    bound to the variable by "{self.<field>.var}"
     """
 
-    def __init__(self, *, default='', max_length=100):
+    var_cls = StringVar
+
+    def __init__(self, *, default):
         self._var = None
         self._default = default
-        self._max_length = max_length
+        # computed fields reading this field
+        self._dependents = set()
+        self._watching = False
 
     @property
     def var(self):
         if self._var is None:
-            self._var = StringVar()
+            self._var = self.var_cls()
             self._var.set(self._default)
-        else:
-            return self._var
+            # entries bound to the variable are validated by its field
+            self._var.field = self
+        return self._var
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if _computing:
+            _computing[-1]._depend(self)
         return self.var.get()
 
     def __set__(self, instance, value):
-        if len(value) >= self._max_length:
+        self.var.set(self.clean(value))
+
+    def clean(self, value):
+        """ value to set when it is assigned from python """
+        return value
+
+    def _watch(self):
+        """ invalidate the dependents whenever the variable is written,
+        by python or by a bound widget
+        """
+        if not self._watching:
+            self._watching = True
+            self.var.trace_add('write', self._changed)
+
+    def _changed(self, *args):
+        for dependent in list(self._dependents):
+            dependent._invalidate()
+
+    def validation(self):
+        """ tcl words validating the text of a bound entry, None if no constraint
+        The validation reason (%V) and the text are appended as the last arguments.
+        """
+        return None
+
+    def validatecommand(self, tk):
+        """ validatecommand of entries bound to this field, None if no constraint """
+        words = self.validation()
+        if words is None:
+            return None
+        if tk not in _validating:
+            tk.eval(VALIDATE_PROCS)
+            _validating.add(tk)
+        return tcl.command('::tkouter::validate', tcl.command(*words)) + ' %W %v %V %P'
+
+
+class StringField(Field):
+    """ basic field which is implemented by StringVar
+    The pattern is a regular expression the whole text should match, it is
+    checked after every key typed into a bound entry, so it should accept
+    the partial text as well, like "[0-9]{0,3}(-[0-9]{0,4})?".
+    """
+
+    def __init__(self, *, default='', max_length=100, pattern=None):
+        super().__init__(default=default)
+        self._max_length = max_length
+        self._pattern = pattern
+
+    def clean(self, value):
+        if self._max_length is not None and len(value) > self._max_length:
             value = value[:self._max_length]
-        self.var.set(value)
+        if self._pattern is not None and not re.fullmatch(self._pattern, value):
+            msg = 'value "{}" does not match pattern "{}"'
+            raise ValueError(msg.format(value, self._pattern))
+        return value
 
+    def validation(self):
+        if self._max_length is None and self._pattern is None:
+            return None
+        maxlength = '' if self._max_length is None else self._max_length
+        return ['::tkouter::validate_string', maxlength, self._pattern or '']
 
-class BoolField:
+
+class BoolField(Field):
     """ basic field which is implemented by BooleanVar
     """
 
+    var_cls = BooleanVar
+
     def __init__(self, *, default=False):
-        self._var = None
-        self._default = default
+        super().__init__(default=default)
 
-    @property
-    def var(self):
-        if self._var is None:
-            self._var = BooleanVar()
-            self._var.set(self._default)
-        else:
-            return self._var
 
-    def __get__(self, instance, owner):
-        return self.var.get()
+class IntField(Field):
+    """ basic field which is implemented by IntVar
+    Values assigned from python are clamped into [min, max].
+    """
 
-    def __set__(self, instance, value):
-        self.var.set(value)
+    var_cls = IntVar
 
+    def __init__(self, *, default=0, min=None, max=None):
+        super().__init__(default=default)
+        self._min = min
+        self._max = max
 
-class IntField:
-    """ basic field which is implemented by IntVar
+    def clean(self, value):
+        if self._min is not None and value < self._min:
+            value = self._min
+        if self._max is not None and value > self._max:
+            value = self._max
+        return value
+
+    def validation(self):
+        minimum = '' if self._min is None else self._min
+        maximum = '' if self._max is None else self._max
+        return ['::tkouter::validate_int', minimum, maximum]
+
+
+class ComputedField(Field):
+    """ read-only field whose value is computed from other fields
+
+    usage:
+        class Order(TkOutWidget):
+            price = IntField()
+            quantity = IntField(default=1)
+
+            @ComputedField
+            def total(self):
+                return self.price * self.quantity
+
+        <label textvariable="{self.total.var}" />
+
+    The fields read by func are recorded as its dependencies on every
+    computation, and the value is cached until one of them changes. A change
+    invalidates the whole chain of computed fields depending on it at once,
+    and the values are computed again when read, or at the latest when tk is
+    idle, once per change however many dependencies changed, before they are
+    pushed to the variables.
+
+    Like other fields it belongs to the class, so the cached value and the
+    variable are those of the one instance it is bound to. A tkouter widget
+    binds the computed fields of its class when it is built, so they follow
+    the widget built last, and unbinds them when it is destroyed. Any other
+    object binds an unbound field by reading it. Other instances reading the
+    field get the value computed for them without caching.
     """
 
-    def __init__(self, *, default=0):
-        self._var = None
-        self._default = default
+    def __init__(self, func, *, var_cls=StringVar):
+        super().__init__(default='')
+        self.func = func
+        self.var_cls = var_cls
+        self.__doc__ = func.__doc__
+        self._instance = None
+        self._value = None
+        self._valid = False
+        # fields read by the last computation
+        self._dependencies = set()
+
+    def bind(self, instance):
+        """ compute the value for instance, like the tkouter widget defining the field """
+        self._instance = instance
+        self._invalidate()
+
+    def unbind(self, instance):
+        """ release instance if the field is bound to it, the variable keeps
+        its last value
+        """
+        if self._instance is not instance:
+            return
+        self._instance = None
+        self._value = None
+        self._valid = False
+        for field in self._dependencies:
+            field._dependents.discard(self)
+        self._dependencies = set()
 
     @property
     def var(self):
         if self._var is None:
-            self._var = IntVar()
-            self._var.set(self._default)
-        else:
-            return self._var
+            self._var = self.var_cls()
+            self._var.field = self
+            if self._instance is not None:
+                self._var.set(self.value)
+        return self._var
+
+    @property
+    def value(self):
+        if self in _computing:
+            msg = 'computed field "{}" depends on itself'
+            raise ValueError(msg.format(self.func.__name__))
+        if not self._valid:
+            self._compute()
+        return self._value
 
     def __get__(self, instance, owner):
-        return self.var.get()
+        if instance is None:
+            return self
+        if self._instance is None:
+            self.bind(instance)
+        elif self._instance is not instance:
+            return self.func(instance)
+        if _computing:
+            _computing[-1]._depend(self)
+        return self.value
 
     def __set__(self, instance, value):
-        self.var.set(value)
\ No newline at end of file
+        msg = 'computed field "{}" is read-only'
+        raise AttributeError(msg.format(self.func.__name__))
+
+    def _compute(self):
+        for field in self._dependencies:
+            field._dependents.discard(self)
+        self._dependencies = set()
+        _computing.append(self)
+        try:
+            self._value = self.func(self._instance)
+        finally:
+            _computing.pop()
+        self._valid = True
+
+    def _depend(self, field):
+        self._dependencies.add(field)
+        field._dependents.add(self)
+        field._watch()
+
+    def _watch(self):
+        # dependents are invalidated together with this field
+        pass
+
+    def _invalidate(self):
+        if not self._valid:
+            return
+        self._valid = False
+        for dependent in list(self._dependents):
+            dependent._invalidate()
+        if self._var is not None:
+            self._schedule()
+
+    def _schedule(self):
+        """ push the value to the variable when its interpreter is idle """
+        root = self._var._root
+        dirty = _dirty.get(root.tk)
+        if dirty is None:
+            try:
+                root.after_idle(_flush, root.tk)
+            except TclError:
+                # the interpreter is gone with the widgets of the variable
+                return
+            dirty = _dirty[root.tk] = []
+        dirty.append(self)
+
+    def _push(self):
+        # the instance may be unbound since the flush was scheduled
+        if self._instance is None:
+            return
+        value = self.value
+        if self._var.get() != value:
+            self._var.set(value)
+
+
+def _flush(tk):
+    """ push the values of the invalidated computed fields of an interpreter
+    to their variables
+    """
+    for field in _dirty.pop(tk, []):
+        field._push()
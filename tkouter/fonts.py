@@ -0,0 +1,128 @@
+""" Module contains the named fonts shared by all tkouter widgets
+
+usage:
+    button { font: bold 12pt "Helvetica"; }
+    <label font="Courier 10" />
+
+    from tkouter import fonts
+    fonts.cache.scale(1.25)
+
+Every distinct font description is turned into one named tk font, which all
+widgets using the description refer to by name. Descriptions are parsed once,
+and changing a shared font changes all widgets using it.
+"""
+
+__all__ = [
+    'parse_font',
+    'FontCache',
+    'cache',
+]
+
+
+from itertools import count
+import re
+from tkinter import font as tkfont
+
+
+_TOKEN = re.compile(r'''"[^"]*"|'[^']*'|\{[^}]*\}|,|[^\s,]+''')
+_SIZE = re.compile(r'(-?\d+(?:\.\d+)?)(pt|px)?(?:/\S*)?')
+_KEYWORDS = {
+    'bold': ('weight', 'bold'),
+    'bolder': ('weight', 'bold'),
+    'lighter': ('weight', 'normal'),
+    'italic': ('slant', 'italic'),
+    'oblique': ('slant', 'italic'),
+    'roman': ('slant', 'roman'),
+    'underline': ('underline', 1),
+    'overstrike': ('overstrike', 1),
+    'normal': None,
+    'small-caps': None,
+}
+_font_ids = count()
+
+
+def parse_font(value):
+    """ parse a css font shorthand or a tk font description into the options
+    of tkinter.font.Font. Sizes in px are given as negative sizes, which tk
+    takes as pixels. Only the first of the css fallback families is used.
+    """
+    options, family = {}, []
+    for token in _TOKEN.findall(value):
+        if token == ',':
+            break
+        size = _SIZE.fullmatch(token)
+        keyword = token.lower()
+        if keyword in _KEYWORDS:
+            if _KEYWORDS[keyword] is not None:
+                name, option = _KEYWORDS[keyword]
+                options[name] = option
+        elif size is not None and 'size' not in options:
+            points = round(float(size.group(1)))
+            options['size'] = -abs(points) if size.group(2) == 'px' else points
+        else:
+            family.append(token.strip('"\'{}'))
+    if family:
+        options['family'] = ' '.join(family)
+    return options
+
+
+class FontCache:
+    """ named fonts keyed by interpreter and font options
+
+    The same description written differently, like "bold 12pt Helvetica"
+    and "Helvetica 12 bold", gives the same font. Names of fonts which
+    already exist in tk, like TkDefaultFont, are used as they are.
+    """
+
+    def __init__(self):
+        # (interpreter, description) -> font name
+        self._names = {}
+        # (interpreter, font options) -> [Font, size given by the description]
+        self._fonts = {}
+        self.factor = 1.0
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def name(self, master, description):
+        """ name of the shared font of a description """
+        key = (master.tk, description)
+        name = self._names.get(key)
+        if name is None:
+            name = self._names[key] = self._create(master, description)
+        return name
+
+    def font(self, master, description):
+        """ shared tkinter.font.Font of a description """
+        return tkfont.nametofont(self.name(master, description), root=master)
+
+    def _create(self, master, description):
+        if description.strip() in master.tk.splitlist(master.tk.call('font', 'names')):
+            return description.strip()
+        options = parse_font(description)
+        key = (master.tk, tuple(sorted(options.items())))
+        entry = self._fonts.get(key)
+        if entry is None:
+            size = options.get('size')
+            if size is not None:
+                options['size'] = round(size * self.factor)
+            font = tkfont.Font(root=master, name='TkOutFont{}'.format(next(_font_ids)), **options)
+            entry = self._fonts[key] = [font, size]
+        return entry[0].name
+
+    def scale(self, factor):
+        """ set the sizes of all shared fonts to factor times their given size
+        Widgets using the fonts are updated by tk.
+        """
+        self.factor = factor
+        for font, size in self._fonts.values():
+            if size is not None:
+                font.configure(size=round(size * factor))
+
+    def configure(self, master, description, **options):
+        """ change the shared font of a description """
+        self.font(master, description).configure(**options)
+
+
+# the cache shared by all tkouter widgets
+cache = FontCache()
@@ -0,0 +1,182 @@
+""" Module contains the image cache shared by all tkouter widgets
+
+usage:
+    <button src="icons/open.png" src-size="16x16" />
+    <label src="photos/large.jpg" src-size="320x240" src-async="1" />
+
+Images are decoded once per path, size and format and shared by every
+widget using them. Pillow is used to decode and resize when it is installed,
+otherwise tk decodes the file and resizes by integer factors.
+"""
+
+__all__ = [
+    'parse_size',
+    'ImageCache',
+    'cache',
+]
+
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from math import ceil
+from tkinter import PhotoImage
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def parse_size(size):
+    """ "WxH" to (W, H) """
+    if size is None or isinstance(size, tuple):
+        return size
+    width, _, height = size.lower().partition('x')
+    return int(width), int(height)
+
+
+def _decode(src, size):
+    """ read the image file and fit it into size, run in worker threads
+    Return (data, format) for PhotoImage.
+    """
+    if Image is None:
+        with open(src, 'rb') as f:
+            return f.read(), None
+    image = Image.open(src)
+    if size is not None:
+        image.thumbnail(size)
+    buffer = BytesIO()
+    if image.mode in ['RGBA', 'LA', 'P']:
+        image.save(buffer, 'PNG')
+        return buffer.getvalue(), 'png'
+    image.convert('RGB').save(buffer, 'PPM')
+    return buffer.getvalue(), 'ppm'
+
+
+class ImageCache:
+    """ PhotoImage cache keyed by interpreter, path, size and format
+
+    Images are reference counted by the elements using them. Images without
+    references stay cached until the bytes of all cached images exceed the
+    budget, then the least recently released ones are evicted.
+    An async image is given as an empty PhotoImage first, and filled when
+    a worker thread has decoded the file, which is polled with after.
+    """
+
+    def __init__(self, budget=32 * 1024 * 1024, workers=2, poll=20):
+        self.budget = budget
+        self.workers = workers
+        self.poll = poll
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> [image, bytes, references]
+        self._entries = {}
+        self._idle = OrderedDict()
+        self._executor = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {
+            'size': len(self),
+            'bytes': self.nbytes,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def acquire(self, master, src, size=None, format=None, async_=False):
+        """ return (key, image), release the key when the image is not used """
+        size = parse_size(size)
+        key = (master.tk, src, size, format)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._idle.pop(key, None)
+        else:
+            self.misses += 1
+            image = PhotoImage(master=master)
+            if async_:
+                self._load_async(master, key, image)
+            else:
+                self._fill(master, image, size, *self._read(src, size, format))
+            entry = self._entries[key] = [image, 0, 0]
+            self._resize(key)
+        entry[2] += 1
+        return key, entry[0]
+
+    def release(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] == 0:
+            self._idle[key] = None
+            self._evict()
+
+    def clear(self):
+        """ drop all images without references """
+        budget, self.budget = self.budget, 0
+        self._evict()
+        self.budget = budget
+
+    def _read(self, src, size, format):
+        if Image is None:
+            return None, format, src
+        data, format = _decode(src, size)
+        return data, format, None
+
+    def _fill(self, master, image, size, data, format, file=None):
+        source = {'data': data} if file is None else {'file': file}
+        if format is not None:
+            source['format'] = format
+        if size is None or Image is not None:
+            image.configure(**source)
+            return
+        decoded = PhotoImage(master=master, **source)
+        width, height = decoded.width(), decoded.height()
+        factor = max(ceil(width / size[0]), ceil(height / size[1]))
+        if factor > 1:
+            image.tk.call(image.name, 'copy', decoded.name, '-subsample', factor, factor)
+        else:
+            zoom = max(1, min(size[0] // width, size[1] // height))
+            image.tk.call(image.name, 'copy', decoded.name, '-zoom', zoom, zoom)
+
+    def _load_async(self, master, key, image):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers)
+        _, src, size, format = key
+        future = self._executor.submit(_decode, src, size)
+        master.after(self.poll, self._check, master, key, image, future)
+
+    def _check(self, master, key, image, future):
+        if not future.done():
+            master.after(self.poll, self._check, master, key, image, future)
+            return
+        data, format = future.result()
+        self._fill(master, image, key[2], data, format or key[3])
+        if self._entries.get(key, [None])[0] is image:
+            self._resize(key)
+
+    def _resize(self, key):
+        entry = self._entries[key]
+        nbytes = entry[0].width() * entry[0].height() * 4
+        self.nbytes += nbytes - entry[1]
+        entry[1] = nbytes
+        self._evict()
+
+    def _evict(self):
+        while self.nbytes > self.budget and self._idle:
+            key, _ = self._idle.popitem(last=False)
+            self.nbytes -= self._entries.pop(key)[1]
+            self.evictions += 1
+
+
+# the cache shared by all tkouter widgets
+cache = ImageCache()
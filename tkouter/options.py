@@ -0,0 +1,284 @@
+""" Module contains the option schemas used to type layout attributes
+
+Attributes of layout tags are strings. For the stock widgets, their values are
+converted and validated once when the layout is compiled, so typos are
+reported before any widget is created and tk does not have to parse the same
+strings again for every instance.
+"""
+
+__all__ = [
+    'Str',
+    'Int',
+    'Float',
+    'Bool',
+    'Color',
+    'Distance',
+    'Pad',
+    'Enum',
+    'Sticky',
+    'Size',
+    'SCHEMAS',
+    'METHOD_SCHEMAS',
+    'GRID_SCHEMA',
+]
+
+
+import re
+from tkinter import Button, Entry, Frame, Label, Listbox, Spinbox
+from tkinter import ttk
+
+
+class Str:
+    """ option which is passed to tk as it is """
+
+    def convert(self, value):
+        return value
+
+
+class Int(Str):
+
+    def convert(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError('{!r} is not an integer'.format(value)) from None
+
+
+class Float(Str):
+
+    def convert(self, value):
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError('{!r} is not a number'.format(value)) from None
+
+
+class Bool(Str):
+    TRUE = ['1', 'true', 'yes', 'on']
+    FALSE = ['0', 'false', 'no', 'off']
+
+    def convert(self, value):
+        if value.lower() in self.TRUE:
+            return True
+        elif value.lower() in self.FALSE:
+            return False
+        raise ValueError('{!r} is not a boolean'.format(value))
+
+
+class Color(Str):
+    PATTERN = re.compile(r'#([0-9a-fA-F]{3}){1,4}|[a-zA-Z][a-zA-Z0-9 ]*|')
+
+    def convert(self, value):
+        if not self.PATTERN.fullmatch(value):
+            raise ValueError('{!r} is not a color'.format(value))
+        return value
+
+
+class Distance(Str):
+    """ screen distance, plain numbers are pixels and others keep their unit """
+    PATTERN = re.compile(r'-?(\d+\.?\d*|\.\d+)[cimp]?')
+
+    def convert(self, value):
+        value = value.strip()
+        if not self.PATTERN.fullmatch(value):
+            raise ValueError('{!r} is not a screen distance'.format(value))
+        for number in [int, float]:
+            try:
+                return number(value)
+            except ValueError:
+                pass
+        return value
+
+
+class Pad(Distance):
+    """ one distance or two distances for both sides """
+
+    def convert(self, value):
+        values = tuple(super(Pad, self).convert(v) for v in value.split())
+        if len(values) not in [1, 2]:
+            raise ValueError('{!r} is not one or two screen distances'.format(value))
+        return values[0] if len(values) == 1 else values
+
+
+class Enum(Str):
+
+    def __init__(self, *values):
+        self.values = values
+
+    def convert(self, value):
+        if value not in self.values:
+            msg = '{!r} is not one of {}'
+            raise ValueError(msg.format(value, ', '.join(self.values)))
+        return value
+
+
+class Sticky(Str):
+    PATTERN = re.compile(r'[nsewNSEW, ]*')
+
+    def convert(self, value):
+        if not self.PATTERN.fullmatch(value):
+            raise ValueError('{!r} is not a combination of n, s, e and w'.format(value))
+        return value
+
+
+class Size(Str):
+    """ size of an image as WxH """
+    PATTERN = re.compile(r'(\d+)[xX](\d+)')
+
+    def convert(self, value):
+        match = self.PATTERN.fullmatch(value.strip())
+        if match is None:
+            raise ValueError('{!r} is not a size like 32x32'.format(value))
+        return int(match.group(1)), int(match.group(2))
+
+
+ANCHOR = Enum('n', 'ne', 'e', 'se', 's', 'sw', 'w', 'nw', 'center')
+RELIEF = Enum('flat', 'raised', 'sunken', 'groove', 'ridge', 'solid')
+JUSTIFY = Enum('left', 'center', 'right')
+COMPOUND = Enum('none', 'text', 'image', 'center', 'top', 'bottom', 'left', 'right')
+STATE = Enum('normal', 'active', 'disabled')
+ENTRY_STATE = Enum('normal', 'disabled', 'readonly')
+VALIDATE = Enum('none', 'focus', 'focusin', 'focusout', 'key', 'all')
+
+
+def _schema(*bases, **options):
+    schema = {}
+    for base in bases:
+        schema.update(base)
+    schema.update(options)
+    return schema
+
+
+_COMMON = dict(
+    background=Color(), bg=Color(), borderwidth=Distance(), bd=Distance(),
+    cursor=Str(), highlightbackground=Color(), highlightcolor=Color(),
+    highlightthickness=Distance(), relief=RELIEF, takefocus=Str(),
+)
+
+_TEXT = _schema(
+    _COMMON,
+    font=Str(), foreground=Color(), fg=Color(), justify=JUSTIFY,
+    textvariable=Str(), exportselection=Bool(),
+)
+
+_LABEL = _schema(
+    _TEXT,
+    activebackground=Color(), activeforeground=Color(), anchor=ANCHOR, bitmap=Str(),
+    compound=COMPOUND, disabledforeground=Color(), height=Distance(), image=Str(),
+    padx=Distance(), pady=Distance(), state=STATE, text=Str(), underline=Int(),
+    width=Distance(), wraplength=Distance(),
+)
+del _LABEL['exportselection']
+
+_INSERT = dict(
+    insertbackground=Color(), insertborderwidth=Distance(), insertofftime=Int(),
+    insertontime=Int(), insertwidth=Distance(), selectbackground=Color(),
+    selectborderwidth=Distance(), selectforeground=Color(), xscrollcommand=Str(),
+)
+
+_ENTRY = _schema(
+    _TEXT, _INSERT,
+    disabledbackground=Color(), disabledforeground=Color(), invalidcommand=Str(),
+    invcmd=Str(), readonlybackground=Color(), show=Str(), state=ENTRY_STATE,
+    validate=VALIDATE, validatecommand=Str(), vcmd=Str(), width=Int(),
+)
+
+_TTK = dict(
+    cursor=Str(), style=Str(), takefocus=Str(),
+)
+_TTK_LABEL = _schema(
+    _TTK,
+    compound=COMPOUND, image=Str(), padding=Str(), state=Str(), text=Str(),
+    textvariable=Str(), underline=Int(), width=Int(),
+)
+_TTK_ENTRY = _schema(
+    _TTK,
+    background=Color(), exportselection=Bool(), font=Str(), foreground=Color(),
+    invalidcommand=Str(), justify=JUSTIFY, show=Str(), state=Str(),
+    textvariable=Str(), validate=VALIDATE, validatecommand=Str(), width=Int(),
+    xscrollcommand=Str(),
+)
+_TTK_FRAME = _schema(
+    _TTK,
+    borderwidth=Distance(), height=Distance(), padding=Str(), relief=RELIEF,
+    width=Distance(),
+)
+
+# widget class -> {option name: option type}
+SCHEMAS = {
+    Label: _LABEL,
+    Button: _schema(
+        _LABEL,
+        command=Str(), default=STATE, overrelief=Enum('', *RELIEF.values),
+        repeatdelay=Int(), repeatinterval=Int(),
+    ),
+    Entry: _ENTRY,
+    Spinbox: _schema(
+        _ENTRY,
+        activebackground=Color(), buttonbackground=Color(), buttoncursor=Str(),
+        buttondownrelief=RELIEF, buttonuprelief=RELIEF, command=Str(), format=Str(),
+        increment=Float(), repeatdelay=Int(), repeatinterval=Int(), to=Float(),
+        values=Str(), wrap=Bool(), **{'from': Float()}
+    ),
+    Listbox: _schema(
+        _TEXT,
+        activestyle=Enum('dotbox', 'none', 'underline'), disabledforeground=Color(),
+        height=Int(), listvariable=Str(), selectbackground=Color(),
+        selectborderwidth=Distance(), selectforeground=Color(),
+        selectmode=Enum('single', 'browse', 'multiple', 'extended'), setgrid=Bool(),
+        state=Enum('normal', 'disabled'), width=Int(), xscrollcommand=Str(),
+        yscrollcommand=Str(),
+    ),
+    Frame: _schema(
+        _COMMON,
+        colormap=Str(), container=Bool(), height=Distance(), padx=Distance(),
+        pady=Distance(), visual=Str(), width=Distance(),
+    ),
+    ttk.Combobox: _schema(
+        _TTK_ENTRY,
+        height=Int(), postcommand=Str(), values=Str(),
+    ),
+    ttk.Treeview: _schema(
+        _TTK,
+        columns=Str(), displaycolumns=Str(), height=Int(), padding=Str(),
+        selectmode=Enum('extended', 'browse', 'none'), show=Str(),
+        xscrollcommand=Str(), yscrollcommand=Str(),
+    ),
+    ttk.Notebook: _schema(
+        _TTK,
+        height=Distance(), padding=Str(), width=Distance(),
+    ),
+    ttk.Radiobutton: _schema(
+        _TTK_LABEL,
+        command=Str(), value=Str(), variable=Str(),
+    ),
+    ttk.Checkbutton: _schema(
+        _TTK_LABEL,
+        command=Str(), offvalue=Str(), onvalue=Str(), variable=Str(),
+    ),
+    ttk.LabelFrame: _schema(
+        _TTK_FRAME,
+        labelanchor=Enum('nw', 'n', 'ne', 'en', 'e', 'es', 'se', 's', 'sw', 'ws', 'w', 'wn'),
+        labelwidget=Str(), text=Str(), underline=Int(),
+    ),
+}
+
+# widget method -> {option name: option type}
+METHOD_SCHEMAS = {
+    'pack': dict(
+        after=Str(), anchor=ANCHOR, before=Str(), expand=Bool(),
+        fill=Enum('none', 'x', 'y', 'both'), ipadx=Distance(), ipady=Distance(),
+        padx=Pad(), pady=Pad(), side=Enum('top', 'bottom', 'left', 'right'),
+        **{'in': Str()}
+    ),
+    'src': {
+        'size': Size(), 'format': Str(), 'async': Bool(),
+    },
+}
+
+# options of <gd> tag
+GRID_SCHEMA = dict(
+    column=Int(), columnspan=Int(), ipadx=Distance(), ipady=Distance(),
+    padx=Pad(), pady=Pad(), row=Int(), rowspan=Int(), sticky=Sticky(),
+    **{'in': Str()}
+)
@@ -0,0 +1,152 @@
+""" Module contains the pool used to recycle widgets
+"""
+
+__all__ = [
+    'WidgetPool',
+]
+
+
+from collections import OrderedDict
+import weakref
+
+
+class _Snapshot(dict):
+    """ options of a new widget, a dict which can be referenced weakly """
+
+
+class WidgetPool:
+    """ keep released widgets and hand them out again
+
+    Creating a tk widget costs a tcl command registration and lots of
+    interpreter work, so apps which add and remove many widgets can release
+    them to the pool instead of destroying them.
+    Widgets are keyed by master, widget class and initial options. A released
+    widget is unmapped and reset to the options the first widget of its key
+    had when it was created.
+    Handed out widgets are referenced weakly, so those destroyed directly
+    instead of released are not kept alive by the pool.
+    When more than maxsize widgets are idle, the least recently released one
+    is destroyed.
+
+    usage:
+        label = pool.acquire(Label, frame, width=10)
+        label.pack()
+        ...
+        pool.release(label)
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # widget -> (key, snapshot) and key -> snapshot, shared by the widgets
+        # of a key as long as one of them is alive
+        self._keys = weakref.WeakKeyDictionary()
+        self._snapshots = weakref.WeakValueDictionary()
+        self._free = {}
+        self._idle = OrderedDict()
+
+    def __len__(self):
+        return len(self._idle)
+
+    @property
+    def hit_rate(self):
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    @property
+    def stats(self):
+        return {
+            'size': len(self),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+    @staticmethod
+    def _make_key(widget_cls, master, options):
+        key = (master, widget_cls, tuple(sorted(options.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def acquire(self, widget_cls, master, **options):
+        """ get an idle widget with the same key or create a new one """
+        key = self._make_key(widget_cls, master, options)
+        free = self._free.get(key)
+        while free:
+            widget, _ = free.popitem()
+            del self._idle[widget]
+            # idle widgets die with their master
+            if widget.winfo_exists():
+                self.hits += 1
+                return widget
+        self.misses += 1
+        widget = widget_cls(master, **options)
+        if key is not None:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                snapshot = self._snapshots[key] = self._snapshot(widget)
+            self._keys[widget] = key, snapshot
+        return widget
+
+    def release(self, widget):
+        """ unmap and reset the widget then keep it for later acquire
+        Releasing an idle widget again does nothing.
+        """
+        if widget in self._idle:
+            return
+        key, snapshot = self._keys.get(widget, (None, None))
+        if key is None or self.maxsize <= 0:
+            self._destroy(widget)
+            return
+        self._unmap(widget)
+        self._reset(widget, snapshot)
+        self._free.setdefault(key, OrderedDict())[widget] = None
+        self._idle[widget] = key
+        while len(self._idle) > self.maxsize:
+            self._evict()
+
+    def clear(self):
+        """ destroy all idle widgets """
+        while self._idle:
+            self._evict()
+
+    def _evict(self):
+        widget, key = self._idle.popitem(last=False)
+        del self._free[key][widget]
+        if not self._free[key]:
+            del self._free[key]
+        self.evictions += 1
+        self._destroy(widget)
+
+    def _destroy(self, widget):
+        self._keys.pop(widget, None)
+        widget.destroy()
+
+    @staticmethod
+    def _unmap(widget):
+        manager = widget.winfo_manager()
+        if manager == 'pack':
+            widget.pack_forget()
+        elif manager == 'grid':
+            widget.grid_forget()
+        elif manager == 'place':
+            widget.place_forget()
+
+    @staticmethod
+    def _snapshot(widget):
+        # alias entries like 'bg' only have two items
+        return _Snapshot((name, str(config[-1])) for name, config in widget.configure().items()
+                         if len(config) == 5)
+
+    def _reset(self, widget, snapshot):
+        changed = {name: value for name, value in self._snapshot(widget).items()
+                   if snapshot.get(name, value) != value}
+        if changed:
+            widget.configure(**{name: snapshot[name] for name in changed})
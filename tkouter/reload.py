@@ -0,0 +1,101 @@
+""" Module contains the watcher used to hot reload tkouter widgets
+"""
+
+__all__ = [
+    'LayoutWatcher',
+]
+
+
+import logging
+import time
+import traceback
+
+from jinja2 import Environment, TemplateNotFound
+
+
+logger = logging.getLogger(__name__)
+
+
+class LayoutWatcher:
+    """ poll the templates of a tkouter widget and reload it on change
+
+    The templates are the layout file and the stylesheets referenced by
+    <link>, both loaded through TkOutWidget.loader. Changes are detected by
+    the uptodate check of the jinja loader, which compares the mtime of the
+    file for FileSystemLoader, so no external dependency is needed.
+    A failed reload is retried only after another template changes, as the
+    broken one is up to date for the loader but not for the running layout.
+    """
+
+    def __init__(self, tkoutw, interval=500):
+        self.tkoutw = tkoutw
+        self.interval = interval
+        # seconds taken by the last successful reload and its rebuilt subtrees
+        self.last_latency = None
+        self.last_rebuilt = None
+        self._after_id = None
+        # uptodate checks of the templates when the last reload failed
+        self._failed = None
+
+    @property
+    def is_running(self):
+        return self._after_id is not None
+
+    @property
+    def is_outdated(self):
+        if self._failed is not None:
+            return not all(uptodate() for uptodate in self._failed)
+        return not all(t.is_up_to_date for t in self.tkoutw._templates)
+
+    def start(self):
+        if not self.is_running:
+            self._after_id = self.tkoutw.after(self.interval, self._poll)
+
+    def stop(self):
+        if self.is_running:
+            self.tkoutw.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _poll(self):
+        self._after_id = None
+        if self.is_outdated:
+            self.reload()
+        self.start()
+
+    def reload(self):
+        start = time.perf_counter()
+        try:
+            rebuilt = self.tkoutw.reload()
+        except Exception:
+            # keep the current widgets when the edited layout is broken
+            print('Error when reloading {}:'.format(self.tkoutw.__class__.__name__))
+            traceback.print_exc()
+            self._failed = self._uptodate_checks()
+            return
+        self._failed = None
+        self.last_latency = time.perf_counter() - start
+        self.last_rebuilt = rebuilt
+        logger.debug('reloaded %s in %.1f ms (%d subtrees rebuilt)',
+                     self.tkoutw.__class__.__name__, self.last_latency * 1000, rebuilt)
+
+    def _uptodate_checks(self):
+        """ return the uptodate checks of every template of the loader
+
+        Templates the failed layout links to may not be compiled yet, so the
+        whole loader is watched when it can list its templates.
+        """
+        loader = self.tkoutw.loader
+        env = Environment(loader=loader)
+        try:
+            names = loader.list_templates()
+        except TypeError:
+            names = [t.name for t in self.tkoutw._templates]
+        checks = []
+        for name in names:
+            try:
+                uptodate = loader.get_source(env, name)[2]
+            except TemplateNotFound:
+                continue
+            if uptodate is not None:
+                checks.append(uptodate)
+        return checks
@@ -0,0 +1,179 @@
+""" Module contains the runtime repeat used by <for> tag
+"""
+
+__all__ = [
+    'Repeat',
+]
+
+
+from bisect import bisect_left
+from collections.abc import Mapping
+import copy
+
+from .errors import RepeatKeyError
+
+
+def longest_increasing_subsequence(seq):
+    """ return the set of indexes of one longest increasing subsequence """
+    tails, tail_indexes, prev = [], [], [None] * len(seq)
+    for i, value in enumerate(seq):
+        pos = bisect_left(tails, value)
+        if pos == len(tails):
+            tails.append(value)
+            tail_indexes.append(i)
+        else:
+            tails[pos] = value
+            tail_indexes[pos] = i
+        prev[i] = tail_indexes[pos - 1] if pos else None
+    result = set()
+    i = tail_indexes[-1] if tail_indexes else None
+    while i is not None:
+        result.add(i)
+        i = prev[i]
+    return result
+
+
+class Repeat:
+    """ build the template of a <for> tag once per item of a collection
+
+    usage:
+        <for each="{self.rows}" key="id" as="row">
+            <label text="{row.name}" />
+        </for>
+
+    The built subtrees are keyed, so refresh only creates, destroys or moves
+    the subtrees of the items which were added, removed, replaced or
+    reordered. An item is replaced when it is not equal to the copy of the
+    old item with the same key taken when it was built, so changing an item in
+    place is seen too. Items which are not equal to their own copy, like
+    objects without __eq__, are compared as they are.
+    """
+
+    def __init__(self, element):
+        self.element = element
+        if getattr(element, '_template', None) is None:
+            element.detach_template()
+        self.last_diff = (0, 0, 0)
+        self._keys = []
+        self._items = {}
+        self._nodes = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def is_alive(self):
+        return self.element._repeat is self
+
+    @property
+    def collection(self):
+        each = self.element.get('each')
+        return self.element._handle_options({'each': each})['each']
+
+    @property
+    def widgets(self):
+        """ root widgets of items in display order """
+        return [self._nodes[key].widget for key in self._keys]
+
+    def key(self, item):
+        name = self.element.get('key')
+        if name is None:
+            return item
+        elif isinstance(item, Mapping) or not hasattr(item, name):
+            return item[name]
+        return getattr(item, name)
+
+    def refresh(self):
+        items = list(self.collection)
+        keys = [self.key(item) for item in items]
+        new_items = dict(zip(keys, items))
+        if len(new_items) != len(keys):
+            msg = 'items of <for each="{}"> do not have unique keys'
+            raise RepeatKeyError(msg.format(self.element.get('each')))
+
+        destroyed = 0
+        for key in self._keys:
+            if key not in new_items or new_items[key] != self._items[key]:
+                self._destroy(key)
+                destroyed += 1
+        old_index = {key: i for i, key in enumerate(self._keys) if key in self._nodes}
+
+        created = 0
+        for key in keys:
+            if key not in self._nodes:
+                self._create(key, new_items[key])
+                created += 1
+
+        # items on the longest increasing subsequence of old positions stay
+        survivors = [key for key in keys if key in old_index]
+        stable = longest_increasing_subsequence([old_index[key] for key in survivors])
+        stable = {survivors[i] for i in stable}
+        moved, next_node = 0, None
+        for key in reversed(keys):
+            node = self._nodes[key]
+            if key not in stable:
+                self._place(node, next_node)
+                moved += key in old_index
+            next_node = node
+
+        self._keys = keys
+        self.last_diff = (created, moved, destroyed)
+
+    def _create(self, key, item):
+        node = copy.deepcopy(self.element._template)
+        self.element.append(node)
+        # keep the proxies alive for storing data to them
+        self._nodes[key] = node
+        self._items[key] = self._snapshot(item)
+        node._proxies = proxies = list(self._iter_tags(node))
+        # the copy takes the typed option values and css declarations of the template
+        node._elements = list(node.iter())
+        for src, dst in zip(self.element._template.iter(), node._elements):
+            if hasattr(src, '_typed'):
+                dst._typed = src._typed
+            if hasattr(src, '_styled'):
+                dst._styled = dict(src._styled)
+        context = dict(self.element.data_context)
+        context[self.element.get('as') or 'item'] = item
+        tkoutw = self.element.tkoutw
+        for e in proxies:
+            with tkoutw._tag_error_report(e):
+                e.init(tkoutw, context)
+                e.display()
+
+    def _destroy(self, key):
+        node = self._nodes.pop(key)
+        del self._items[key]
+        for e in node._proxies:
+            if e.is_repeat:
+                e._repeat = None
+        for e in node.iter():
+            if getattr(e, '_handler_ids', None) is not None:
+                e.release_resources()
+        node.widget.destroy()
+        self.element.remove(node)
+
+    def _place(self, node, next_node):
+        if next_node is None:
+            node.widget.pack_forget()
+            node.widget.pack(**node.pack_options)
+            self.element.append(node)
+        else:
+            node.widget.pack_configure(before=next_node.widget)
+            next_node.addprevious(node)
+
+    @staticmethod
+    def _snapshot(item):
+        try:
+            snapshot = copy.deepcopy(item)
+        except (TypeError, copy.Error):
+            return item
+        return snapshot if snapshot == item else item
+
+    @classmethod
+    def _iter_tags(cls, e):
+        """ iterate the subtree without entering templates of nested <for> """
+        yield e
+        if not e.is_repeat:
+            for child in e:
+                yield from cls._iter_tags(child)
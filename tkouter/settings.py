@@ -9,6 +9,8 @@ from tkinter import ttk
 
 from jinja2 import FileSystemLoader
 
+from .widgets import LayerCanvas, LazyTree, LogView, Table
+
 
 WIDGETS = {
     # widget tag type
@@ -19,6 +21,10 @@ WIDGETS = {
     'combobox': ttk.Combobox,
     'listbox': Listbox,
     'treeview': ttk.Treeview,
+    'lazytree': LazyTree,
+    'canvas': LayerCanvas,
+    'logview': LogView,
+    'table': Table,
     'notebook': ttk.Notebook,
     'radiobutton': ttk.Radiobutton,
     'checkbutton': ttk.Checkbutton,
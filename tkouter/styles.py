@@ -0,0 +1,233 @@
+""" Module contains helpers to map css rules onto tk styling mechanisms
+"""
+
+__all__ = [
+    'is_stock_widget',
+    'widget_options',
+    'widget_defaults',
+    'ttk_style',
+    'ClassRules',
+]
+
+
+from collections import Counter, OrderedDict
+from copy import copy
+from itertools import count
+from tkinter import ttk
+
+from . import fonts
+from .options import METHOD_SCHEMAS, SCHEMAS
+
+
+# widget class -> (tk class name, {option name: database name}, {option name: default})
+_WIDGET_OPTIONS = {}
+
+# (interpreter, tk class name, style options) -> ttk style name
+_TTK_STYLES = {}
+_style_ids = count()
+
+
+def is_stock_widget(widget_cls):
+    """ widget class is provided by tkinter or ttk itself """
+    return widget_cls.__module__ in ['tkinter', 'tkinter.ttk']
+
+
+def widget_options(widget_cls, master):
+    """ query tk class name and options of a widget class by a probe widget
+    The result is cached, so the probe is created once per widget class.
+    """
+    if widget_cls not in _WIDGET_OPTIONS:
+        probe = widget_cls(master)
+        try:
+            configs = [config for config in probe.configure().values() if len(config) == 5]
+            options = {config[0]: config[1] for config in configs}
+            defaults = {config[0]: config[3] for config in configs}
+            _WIDGET_OPTIONS[widget_cls] = (probe.winfo_class(), options, defaults)
+        finally:
+            probe.destroy()
+    return _WIDGET_OPTIONS[widget_cls][:2]
+
+
+def widget_defaults(widget_cls, master):
+    """ default option values of a widget class """
+    widget_options(widget_cls, master)
+    return _WIDGET_OPTIONS[widget_cls][2]
+
+
+def ttk_style(master, tk_class, options):
+    """ name of a ttk style deriving tk_class with the options
+    Widgets given the same options share one style.
+    """
+    key = (master.tk, tk_class, tuple(sorted(options.items())))
+    if key not in _TTK_STYLES:
+        style = 'TkOutStyle{}.{}'.format(next(_style_ids), tk_class)
+        ttk.Style(master).configure(style, **options)
+        _TTK_STYLES[key] = style
+    return _TTK_STYLES[key]
+
+
+class ClassRules:
+    """ css rules with a bare tag selector which apply to a whole widget class
+
+    Instead of copying their declarations into every matching element, they
+    are compiled once into the tk option database for classic widgets, and
+    into a ttk style shared by equal options for ttk widgets. Widgets then pick them up natively
+    and only the per-element overrides are passed at construction.
+
+    A tag is eligible only when every widget of its class in the layout uses
+    that tag and all widgets in the layout are stock widgets, otherwise the
+    option database would leak the rule onto other elements.
+    """
+
+    def __init__(self, root, widgets):
+        self.rules = OrderedDict()
+        self._tags = self._eligible_tags(root, widgets)
+
+    @staticmethod
+    def _eligible_tags(root, widgets):
+        tags_of_cls, head_tags = {}, set()
+        for e in root.iterdescendants():
+            if e.is_under_head:
+                head_tags.add(e.tag)
+                continue
+            widget_cls = widgets.get(e.widget_type)
+            if widget_cls is None:
+                continue
+            if not is_stock_widget(widget_cls):
+                return set()
+            tags_of_cls.setdefault(widget_cls, set()).add(e.tag)
+        aliases = Counter(widgets.values())
+        return {tag for tag, widget_cls in widgets.items()
+                if is_stock_widget(widget_cls) and tag not in head_tags and aliases[widget_cls] == 1
+                and tags_of_cls.get(widget_cls, {tag}) == {tag}}
+
+    def add(self, rule):
+        """ keep the rule if it is a class rule, return True if kept """
+        tag = rule.selector.as_css().strip()
+        if tag not in self._tags:
+            return False
+        declarations = self.rules.setdefault(tag, OrderedDict())
+        for d in rule.declarations:
+            declarations.setdefault(d.name, d.value.as_css())
+        return True
+
+    def type_options(self, widgets, strict=True):
+        """ check the declarations by the schema of their widget class
+        They stay strings for the option database, only the problems found are
+        returned. Unknown names of ttk widgets are options of their style.
+        """
+        problems = []
+        for tag, declarations in self.rules.items():
+            widget_cls = widgets[tag]
+            for name, value in declarations.items():
+                # method options like pack-fill are checked like on elements
+                method, _, attr = name.partition('-') if '-' in name else ('', '', name)
+                schema = METHOD_SCHEMAS.get(method) if method else SCHEMAS.get(widget_cls)
+                if schema is None:
+                    continue
+                if attr in schema:
+                    try:
+                        schema[attr].convert(value)
+                    except ValueError as e:
+                        problems.append('css rule "{}": option "{}": {}'.format(tag, name, e))
+                elif strict and (method or not issubclass(widget_cls, ttk.Widget)):
+                    problems.append('css rule "{}": unknown option "{}"'.format(tag, name))
+        return problems
+
+    def changed_tags(self, other):
+        """ tags whose class rules differ from the other class rules """
+        return {tag for tag in set(self.rules) | set(other.rules)
+                if self.rules.get(tag) != other.rules.get(tag)}
+
+    def install(self, tkoutw, elements):
+        """ compile the rules into the option database and ttk styles """
+        self.apply(tkoutw, elements)
+        self.configure(tkoutw)
+
+    def empty(self):
+        """ class rules of the same layout without any rule, for another stylesheet """
+        other = copy(self)
+        other.rules = OrderedDict()
+        return other
+
+    def _compiled(self, tkoutw):
+        """ yield each rule split by where it goes:
+        (tag, widget class, declarations, option database entries as
+        {pattern: (option name, value)}, overrides passed at construction)
+        Style options of ttk widgets go to a style shared by equal options,
+        which is one of the overrides.
+        """
+        if not self.rules:
+            return
+        # scoped by the path name, the frame keeps its Frame class for other rules
+        scope = '{}{}'.format(tkoutw.tk.call('winfo', 'name', '.'), tkoutw)
+        for tag, declarations in self.rules.items():
+            if 'font' in declarations:
+                declarations = OrderedDict(declarations)
+                declarations['font'] = fonts.cache.name(tkoutw, declarations['font'])
+            widget_cls = tkoutw.widgets[tag]
+            tk_class, options = widget_options(widget_cls, tkoutw)
+            entries, overrides = {}, {}
+            if issubclass(widget_cls, ttk.Widget):
+                style_options = {name: value for name, value in declarations.items()
+                                 if name not in options}
+                if style_options:
+                    overrides['style'] = ttk_style(tkoutw, tk_class, style_options)
+                overrides.update((name, value) for name, value in declarations.items()
+                                 if name in options)
+            else:
+                for name, value in declarations.items():
+                    if name in options:
+                        pattern = '{}*{}.{}'.format(scope, tk_class, options[name])
+                        entries[pattern] = (name, value)
+                    else:
+                        overrides[name] = value
+            yield tag, widget_cls, declarations, entries, overrides
+
+    def styles(self, tkoutw):
+        """ {tag: (widget class, declarations, overrides, styles)} of the rules
+        Elements covered by a rule are constructed with its overrides, and
+        styles are all the options the rule gives them, including those left
+        to the option database.
+        """
+        return {tag: (widget_cls, declarations, overrides,
+                      dict(overrides, **{name: value for name, value in entries.values()}))
+                for tag, widget_cls, declarations, entries, overrides in self._compiled(tkoutw)}
+
+    def apply(self, tkoutw, elements):
+        """ set the overrides of the rules on the elements, which have to be
+        initialized afterwards
+        """
+        for tag, (widget_cls, declarations, overrides, covered) in self.styles(tkoutw).items():
+            for e in elements:
+                if e.tag != tag:
+                    continue
+                # tag with another type is not covered by the class rule
+                if tkoutw.widgets.get(e.widget_type) is not widget_cls:
+                    attrs = styles = declarations
+                else:
+                    attrs, styles = overrides, covered
+                # options given by the rule are what a new stylesheet replaces
+                styled = e.__dict__.setdefault('_styled', {})
+                for name, value in styles.items():
+                    if e.get(name) is None and name not in styled:
+                        styled[name] = value
+                for name, value in attrs.items():
+                    if e.get(name) is None:
+                        e.set(name, value)
+
+    def configure(self, tkoutw, previous=None):
+        """ put the rules into the option database, picked up by widgets
+        created afterwards
+        Entries of the previous rules which are not replaced go back to the
+        defaults, the option database cannot remove them.
+        """
+        entries = {}
+        if previous is not None:
+            for _, widget_cls, _, old_entries, _ in previous._compiled(tkoutw):
+                defaults = widget_defaults(widget_cls, tkoutw)
+                entries.update((pattern, defaults[name]) for pattern, (name, _) in old_entries.items())
+        for _, _, _, new_entries, _ in self._compiled(tkoutw):
+            entries.update((pattern, value) for pattern, (_, value) in new_entries.items())
+        for pattern, value in entries.items():
+            tkoutw.option_add(pattern, value)
@@ -0,0 +1,281 @@
+""" Module contains the offloading of cpu-heavy handlers to processes
+
+usage:
+    class Report(TkOutWidget):
+        percent = IntField()
+
+        @offload(progress='percent', done='show')
+        def build(progress, rows=1000):
+            for i in range(rows):
+                ...
+                progress(i * 100 // rows)
+            return summary
+
+        def show(self, summary):
+            ...
+
+    <button command="{self.build}"> Build </button>
+
+The body runs in a process pool, so it does not take self, and its arguments
+and result must be picklable. It may take progress to report values set into
+the progress field, and cancelled to check if the task was cancelled.
+These two are passed by keyword, the other arguments are those of the call,
+none for a command, so rows keeps its default here.
+"""
+
+__all__ = [
+    'offload',
+    'Offload',
+    'Task',
+    'shutdown',
+]
+
+
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import importlib
+import inspect
+from multiprocessing import Manager
+from queue import Empty
+from tkinter import ttk
+
+
+_executor = None
+_manager = None
+
+
+def _get_executor(workers=None):
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(workers)
+    return _executor
+
+
+def _submit(*args):
+    """ submit to the shared pool, which is created again once broken """
+    global _executor
+    try:
+        return _get_executor().submit(*args)
+    except BrokenProcessPool:
+        # a worker died abruptly, the pool refuses any new task
+        _executor.shutdown(wait=False)
+        _executor = None
+        return _get_executor().submit(*args)
+
+
+def _get_manager():
+    global _manager
+    if _manager is None:
+        _manager = Manager()
+    return _manager
+
+
+def shutdown(wait=True):
+    """ stop the processes used by offloaded handlers """
+    global _executor, _manager
+    if _executor is not None:
+        _executor.shutdown(wait)
+        _executor = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
+
+class _Progress:
+    """ progress callable given to the body, values are queued to the widget """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __call__(self, value):
+        self.queue.put(value)
+
+
+class _Cancelled:
+    """ cancelled callable given to the body """
+
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self):
+        return self.event.is_set()
+
+
+def _run(module, qualname, args, kwargs):
+    """ find the body by its name in the worker and call it """
+    body = importlib.import_module(module)
+    for name in qualname.split('.'):
+        body = getattr(body, name)
+    if isinstance(body, Offload):
+        body = body.func
+    return body(*args, **kwargs)
+
+
+def offload(func=None, *, progress=None, done=None, error=None, poll=50, disable=True):
+    """ decorator running a tkouter widget method in a process pool
+
+    - progress: name of the field set to the values reported by the body,
+      True for the field named "<method>_progress"
+    - done: name of the method called with the result
+    - error: name of the method called with the exception, otherwise the
+      exception is reported like other callback exceptions
+    - poll: milliseconds between checks of the task
+    - disable: disable the widgets whose command is the method while it runs
+    """
+    def decorate(func):
+        return Offload(func, progress, done, error, poll, disable)
+    return decorate if func is None else decorate(func)
+
+
+class Offload:
+    """ descriptor of an offloaded method, see offload """
+
+    def __init__(self, func, progress=None, done=None, error=None, poll=50, disable=True):
+        self.func = func
+        self.progress = '{}_progress'.format(func.__name__) if progress is True else progress
+        self.done = done
+        self.error = error
+        self.poll = poll
+        self.disable = disable
+        parameters = inspect.signature(func).parameters
+        self._takes = {name for name in ['progress', 'cancelled'] if name in parameters}
+        self.__doc__ = func.__doc__
+        self.__name__ = func.__name__
+        self.__qualname__ = func.__qualname__
+        self.__module__ = func.__module__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return _BoundOffload(self, instance)
+
+    def start(self, widget, *args, **kwargs):
+        """ submit the body with the arguments, return the Task """
+        return Task(self, widget, args, kwargs)
+
+
+class _BoundOffload:
+    """ offloaded method of a widget, equal for the same widget so the
+    dispatcher gives widgets binding it one handler id
+    """
+
+    def __init__(self, offload, widget):
+        self.offload = offload
+        self.widget = widget
+        self.__qualname__ = offload.__qualname__
+
+    def __eq__(self, other):
+        return (isinstance(other, _BoundOffload) and self.offload is other.offload
+                and self.widget is other.widget)
+
+    def __hash__(self):
+        return hash((id(self.offload), id(self.widget)))
+
+    def __call__(self, *args, **kwargs):
+        return self.offload.start(self.widget, *args, **kwargs)
+
+
+class Task:
+    """ an offloaded call, polled by after on the tk thread """
+
+    def __init__(self, offload, widget, args, kwargs):
+        self.offload = offload
+        self.widget = widget
+        self.cancelled = False
+        self._queue = self._event = None
+        kwargs = dict(kwargs)
+        if 'progress' in offload._takes:
+            self._queue = _get_manager().Queue()
+            kwargs['progress'] = _Progress(self._queue)
+        if 'cancelled' in offload._takes:
+            self._event = _get_manager().Event()
+            kwargs['cancelled'] = _Cancelled(self._event)
+        # widgets are disabled only once the body is submitted
+        self.future = _submit(_run, offload.__module__, offload.__qualname__, args, kwargs)
+        self._disabled = self._disable() if offload.disable else []
+        self._after_id = widget.after(offload.poll, self._check)
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    def cancel(self):
+        """ cancel the task, a running body is told by cancelled() and its
+        result is dropped
+        """
+        if not self.running:
+            return
+        self.cancelled = True
+        self.future.cancel()
+        if self._event is not None:
+            self._event.set()
+        self.widget.after_cancel(self._after_id)
+        self._finish()
+
+    def _check(self):
+        self._report_progress()
+        if not self.future.done():
+            self._after_id = self.widget.after(self.offload.poll, self._check)
+            return
+        self._finish()
+        try:
+            result = self.future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            self._handle_error(e)
+        else:
+            if self.offload.done is not None:
+                getattr(self.widget, self.offload.done)(result)
+
+    def _report_progress(self):
+        if self._queue is None or self.offload.progress is None:
+            return
+        value = None
+        try:
+            while True:
+                value = self._queue.get_nowait()
+        except Empty:
+            pass
+        if value is not None:
+            setattr(self.widget, self.offload.progress, value)
+
+    def _handle_error(self, e):
+        if self.offload.error is not None:
+            getattr(self.widget, self.offload.error)(e)
+        else:
+            self.widget._root().report_callback_exception(type(e), e, e.__traceback__)
+
+    def _finish(self):
+        self._after_id = None
+        for widget, state in self._disabled:
+            if not widget.winfo_exists():
+                continue
+            if isinstance(widget, ttk.Widget):
+                widget.state(state)
+            else:
+                widget.configure(state=state)
+        self._disabled = []
+
+    def _disable(self):
+        """ disable the widgets whose callbacks go to this method
+        Return (widget, state to restore) of each disabled widget.
+        """
+        dispatcher = self.widget.dispatcher
+        hid = dispatcher._ids.get(_BoundOffload(self.offload, self.widget))
+        tree = self.widget.__dict__.get('_tree')
+        if hid is None or tree is None:
+            return []
+        disabled = []
+        for e in tree.getroot().iter():
+            widget = getattr(e, '_widget', None)
+            if widget is None or hid not in getattr(e, '_handler_ids', ()):
+                continue
+            if isinstance(widget, ttk.Widget):
+                if not widget.instate(['disabled']):
+                    widget.state(['disabled'])
+                    disabled.append((widget, ['!disabled']))
+            elif 'state' in widget.keys() and str(widget['state']) != 'disabled':
+                disabled.append((widget, str(widget['state'])))
+                widget.configure(state='disabled')
+        return disabled
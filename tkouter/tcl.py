@@ -0,0 +1,46 @@
+""" Module contains helpers to generate tcl scripts
+"""
+
+__all__ = [
+    'quote',
+    'command',
+]
+
+
+import re
+
+
+_SPECIAL = re.compile(r'[\s{}\[\]$"\\;]|^#|^$')
+_ESCAPE = re.compile(r'([{}\[\]$"\\;#])')
+_WHITESPACE = {' ': '\\ ', '\n': '\\n', '\t': '\\t', '\r': '\\r', '\f': '\\f', '\v': '\\v'}
+
+
+def _balanced(s):
+    depth = 0
+    for char in s:
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def quote(value):
+    """ quote a value as one word of a tcl command """
+    s = str(value)
+    if not _SPECIAL.search(s):
+        return s
+    if '\\' not in s and _balanced(s):
+        return '{' + s + '}'
+    s = _ESCAPE.sub(r'\\\1', s)
+    return ''.join(_WHITESPACE.get(char, char) for char in s)
+
+
+def command(*words, **options):
+    """ build one tcl command, options are appended as -name value pairs """
+    words = list(words)
+    for name, value in options.items():
+        words.extend(['-' + name.rstrip('_'), value])
+    return ' '.join(quote(word) for word in words)
@@ -0,0 +1,510 @@
+""" Module contains the additional widgets provided by tkouter
+"""
+
+__all__ = [
+    'LazyTree',
+    'LayerCanvas',
+    'LogView',
+    'Table',
+]
+
+
+from collections import OrderedDict, deque
+from tkinter import Canvas, Entry, Frame, Label, Text
+import time
+from tkinter import ttk
+
+from . import tcl
+
+
+class LazyTree(ttk.Treeview):
+    """ treeview which inserts the nodes of a data source only when needed
+
+    usage:
+        <lazytree name="files" source="{self.fs}" chunk="200" evict="30000" />
+
+    The data source gives the child nodes of a node by children(node), node
+    is None for the top level. It may also provide text(node), values(node)
+    and has_children(node), otherwise the text is str(node) and every node
+    can be opened.
+    Only top level rows are inserted at first, children are inserted when
+    their parent is opened. Large sets of siblings are inserted chunk rows at
+    a time, letting the event loop run between chunks. Children of a closed
+    branch are deleted after evict milliseconds if evict is given, and are
+    inserted again the next time it is opened.
+    """
+
+    PLACEHOLDER = 'placeholder'
+
+    def __init__(self, master=None, source=None, chunk=500, evict=None, **options):
+        super().__init__(master, **options)
+        self.chunk = int(chunk)
+        self.evict = None if evict is None else int(evict)
+        self.source = None
+        # item id -> node
+        self._nodes = {}
+        # item id -> after id of loading its children or evicting them
+        self._loading = {}
+        self._evicting = {}
+        self.bind('<<TreeviewOpen>>', self._on_open, add='+')
+        self.bind('<<TreeviewClose>>', self._on_close, add='+')
+        if source is not None:
+            self.set_source(source)
+
+    def set_source(self, source):
+        """ show the top level nodes of a new data source """
+        self._forget('')
+        self.source = source
+        self._load('')
+
+    def node(self, item):
+        """ the node of an item id """
+        return self._nodes[item]
+
+    def is_loading(self, item=''):
+        return item in self._loading
+
+    def refresh(self, item=''):
+        """ insert the children of an item again from the data source """
+        self._forget(item)
+        self._load(item)
+
+    def _text(self, node):
+        if hasattr(self.source, 'text'):
+            return self.source.text(node)
+        return str(node)
+
+    def _has_children(self, node):
+        if hasattr(self.source, 'has_children'):
+            return self.source.has_children(node)
+        return True
+
+    def _load(self, item):
+        node = self._nodes.get(item)
+        children = iter(self.source.children(node))
+        self._insert_chunk(item, children)
+
+    def _insert_chunk(self, item, children):
+        self._loading.pop(item, None)
+        if self.exists(self._placeholder(item)):
+            self.delete(self._placeholder(item))
+        values = getattr(self.source, 'values', None)
+        for _ in range(self.chunk):
+            try:
+                node = next(children)
+            except StopIteration:
+                return
+            options = {'values': values(node)} if values is not None else {}
+            child = self.insert(item, 'end', text=self._text(node), **options)
+            self._nodes[child] = node
+            if self._has_children(node):
+                self.insert(child, 'end', iid=self._placeholder(child))
+        self._loading[item] = self.after(1, self._insert_chunk, item, children)
+
+    def _placeholder(self, item):
+        return '{}.{}'.format(item, self.PLACEHOLDER)
+
+    def _forget(self, item):
+        """ delete the children of an item, the item itself is kept """
+        self._cancel(item)
+        for child in self.get_children(item):
+            if child != self._placeholder(item):
+                self._forget(child)
+                self._nodes.pop(child, None)
+        children = self.get_children(item)
+        if children:
+            self.delete(*children)
+
+    def _cancel(self, item):
+        for jobs in [self._loading, self._evicting]:
+            if item in jobs:
+                self.after_cancel(jobs.pop(item))
+
+    def _on_open(self, event):
+        item = self.focus()
+        if item in self._evicting:
+            self.after_cancel(self._evicting.pop(item))
+        if self.exists(self._placeholder(item)) and item not in self._loading:
+            self._load(item)
+
+    def _on_close(self, event):
+        item = self.focus()
+        if self.evict is not None and item and item not in self._evicting:
+            self._evicting[item] = self.after(self.evict, self._evict, item)
+
+    def _evict(self, item):
+        del self._evicting[item]
+        self._forget(item)
+        if self.exists(item):
+            self.insert(item, 'end', iid=self._placeholder(item))
+
+    def destroy(self):
+        for item in list(self._loading) + list(self._evicting):
+            self._cancel(item)
+        super().destroy()
+
+
+class LayerCanvas(Canvas):
+    """ canvas which draws layers of items from data in batches
+
+    usage:
+        <canvas name="plot" width="400" height="300">
+            <layer name="bars" kind="rectangle" data="{self.bars}" fill="gray" />
+            <layer name="curve" kind="line" data="{self.curve}" fill="red" />
+        </canvas>
+
+    Each row of the data is the coordinates of one item, like (x0, y0, x1, y1)
+    for a rectangle. Arrays providing tolist(), like numpy arrays, are
+    accepted as well. All items of a layer are created or moved by one tcl
+    script and share the tag of the layer, so the layer can be moved, hidden
+    or configured as a group. Layers keep the stacking order they are added
+    in, and setting the data of a layer leaves the other layers untouched.
+    """
+
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        # layer name -> [kind, data, options, number of items]
+        self._layers = OrderedDict()
+
+    @property
+    def layers(self):
+        return list(self._layers)
+
+    @staticmethod
+    def layer_tag(name):
+        """ canvas tag shared by the items of a layer """
+        return 'layer.{}'.format(name)
+
+    def set_layer(self, name, kind, data=(), **options):
+        """ add a layer or replace the kind, data and options of a layer """
+        if name in self._layers:
+            self.tk.call(self._w, 'delete', self.layer_tag(name))
+        self._layers[name] = [kind, data, options, 0]
+        self.redraw(name)
+
+    def set_data(self, name, data):
+        """ replace the data of a layer and draw it again """
+        self._layers[name][1] = data
+        self.redraw(name)
+
+    def configure_layer(self, name, **options):
+        """ change item options of all items in a layer """
+        self._layers[name][2].update(options)
+        self.itemconfigure(self.layer_tag(name), **options)
+
+    def show_layer(self, name, visible=True):
+        self.itemconfigure(self.layer_tag(name), state='normal' if visible else 'hidden')
+
+    def move_layer(self, name, dx, dy):
+        self.move(self.layer_tag(name), dx, dy)
+
+    def delete_layer(self, name):
+        self.tk.call(self._w, 'delete', self.layer_tag(name))
+        del self._layers[name]
+
+    def redraw(self, name=None):
+        """ draw a layer or all layers from their data, each by one tcl script
+        Items are moved when the number of rows is unchanged, otherwise they
+        are created again.
+        """
+        for layer in ([name] if name is not None else list(self._layers)):
+            script = self._script(layer)
+            if script:
+                self.tk.eval(script)
+
+    def _script(self, name):
+        kind, data, options, count = self._layers[name]
+        rows = data.tolist() if hasattr(data, 'tolist') else data
+        rows = [' '.join(map(tcl.quote, row)) for row in rows]
+        tag = tcl.quote(self.layer_tag(name))
+        if len(rows) == count:
+            # canvas ids of the layer in stacking order match the rows
+            ids = self.tk.splitlist(self.tk.call(self._w, 'find', 'withtag', self.layer_tag(name)))
+            return '\n'.join('{} coords {} {}'.format(self._w, i, row) for i, row in zip(ids, rows))
+        self._layers[name][3] = len(rows)
+        options = dict(options, tags=self.layer_tag(name))
+        suffix = tcl.command(**options)
+        script = ['{} delete {}'.format(self._w, tag)]
+        script.extend('{} create {} {} {}'.format(self._w, kind, row, suffix) for row in rows)
+        above = self._layer_above(name)
+        if above is not None:
+            script.append('{} lower {} {}'.format(self._w, tag, tcl.quote(self.layer_tag(above))))
+        return '\n'.join(script)
+
+    def _layer_above(self, name):
+        """ the nearest layer added after the given one which has items """
+        layers = list(self._layers)
+        for above in layers[layers.index(name) + 1:]:
+            if self._layers[above][3]:
+                return above
+        return None
+
+
+class LogView(Text):
+    """ read-only text showing a stream of lines with a capped history
+
+    usage:
+        <logview name="log" maxlines="10000" />
+
+        # from any thread
+        self.log.append('connected')
+        logging.getLogger().addHandler(logging.StreamHandler(self.log))
+
+    append and write only put text into a deque, which is safe to do from
+    other threads without a lock. Every interval milliseconds the queued text
+    is inserted by one insert on the main thread, and the oldest lines beyond
+    maxlines are deleted. When more than buffer chunks are waiting, the
+    oldest ones are dropped. The view follows new lines only when it was
+    scrolled to the bottom.
+    """
+
+    def __init__(self, master=None, maxlines=10000, buffer=100000, interval=16, **options):
+        options.setdefault('state', 'disabled')
+        super().__init__(master, **options)
+        self.maxlines = int(maxlines)
+        self.interval = int(interval)
+        self.received = 0
+        self.displayed = 0
+        self.dropped = 0
+        self.trimmed = 0
+        self.throughput = 0.0
+        self._queue = deque(maxlen=int(buffer))
+        self._rate_start, self._rate_count = time.perf_counter(), 0
+        self._after_id = self.after(self.interval, self._drain)
+
+    @property
+    def stats(self):
+        return {
+            'received': self.received,
+            'displayed': self.displayed,
+            'dropped': self.dropped,
+            'trimmed': self.trimmed,
+            'queued': len(self._queue),
+            'throughput': self.throughput,
+        }
+
+    def append(self, line):
+        """ queue one line """
+        self.write(line + '\n')
+
+    def write(self, text):
+        """ queue text, it is a file-like method for logging.StreamHandler """
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(text)
+        self.received += 1
+
+    def flush(self):
+        """ nothing to do, queued text is inserted by the main thread """
+
+    def _drain(self):
+        chunks = []
+        try:
+            while True:
+                chunks.append(self._queue.popleft())
+        except IndexError:
+            pass
+        if chunks:
+            self._insert(''.join(chunks))
+            self.displayed += len(chunks)
+            self._rate_count += len(chunks)
+        now = time.perf_counter()
+        if now - self._rate_start >= 1:
+            self.throughput = self._rate_count / (now - self._rate_start)
+            self._rate_start, self._rate_count = now, 0
+        self._after_id = self.after(self.interval, self._drain)
+
+    def _insert(self, text):
+        at_bottom = self.yview()[1] >= 1.0
+        state = self['state']
+        self.configure(state='normal')
+        self.insert('end', text)
+        # the text always ends with an empty line after the last newline
+        excess = int(self.index('end-1c').split('.')[0]) - 1 - self.maxlines
+        if excess > 0:
+            self.delete('1.0', '{}.0'.format(excess + 1))
+            self.trimmed += excess
+        self.configure(state=state)
+        if at_bottom:
+            self.see('end')
+
+    def clear(self):
+        state = self['state']
+        self.configure(state='normal')
+        self.delete('1.0', 'end')
+        self.configure(state=state)
+
+    def destroy(self):
+        self.after_cancel(self._after_id)
+        super().destroy()
+
+
+class Table(Frame):
+    """ table showing a window of a large 2D data source on recycled cells
+
+    usage:
+        <table name="table" source="{self.matrix}" rows="30" columns="10"
+               header_rows="1" header_columns="1" cell="label" />
+
+    The source is indexed as source[row][column], like a list of lists or an
+    array. Only rows x columns cell widgets are created and laid out by grid,
+    scrolling maps them onto another window of the source. The first
+    header_rows rows and header_columns columns of the source stay in place.
+    Cells are updated only when their text changes, all by one tcl script.
+    Entry cells write edited values back to the source on Return, when they
+    lose focus, or when the table scrolls while one is being edited.
+    """
+
+    def __init__(self, master=None, source=(), rows=20, columns=8, header_rows=0,
+                 header_columns=0, cell='label', width=10, formatter=str, **options):
+        super().__init__(master, **options)
+        self.visible_rows = int(rows)
+        self.visible_columns = int(columns)
+        self.header_rows = int(header_rows)
+        self.header_columns = int(header_columns)
+        self.formatter = formatter
+        self.top = 0
+        self.left = 0
+        self.source = source
+        # (grid row, grid column) -> cell widget and the text it shows
+        self._cells = {}
+        self._texts = {}
+        # path name of entry cell -> (grid row, grid column)
+        self._entries = {}
+        self._cell_cls = Entry if cell == 'entry' else Label
+        self._build_cells(int(width))
+        self._vbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self._hbar = ttk.Scrollbar(self, orient='horizontal', command=self.xview)
+        self._vbar.grid(row=0, column=self.header_columns + self.visible_columns,
+                        rowspan=self.header_rows + self.visible_rows, sticky='ns')
+        self._hbar.grid(row=self.header_rows + self.visible_rows, column=0,
+                        columnspan=self.header_columns + self.visible_columns, sticky='ew')
+        self.refresh()
+
+    def _build_cells(self, width):
+        for i in range(self.header_rows + self.visible_rows):
+            for j in range(self.header_columns + self.visible_columns):
+                header = i < self.header_rows or j < self.header_columns
+                if header or self._cell_cls is Label:
+                    cell = Label(self, width=width, anchor='w', relief='groove' if header else 'flat')
+                else:
+                    cell = Entry(self, width=width)
+                    cell.bind('<Return>', lambda event, at=(i, j): self._commit(at), add='+')
+                    cell.bind('<FocusOut>', lambda event, at=(i, j): self._commit(at), add='+')
+                    self._entries[cell._w] = (i, j)
+                cell.bind('<MouseWheel>', self._on_wheel, add='+')
+                cell.bind('<Button-4>', self._on_wheel, add='+')
+                cell.bind('<Button-5>', self._on_wheel, add='+')
+                cell.grid(row=i, column=j, sticky='nsew')
+                self._cells[i, j] = cell
+                self._texts[i, j] = None
+
+    @property
+    def shape(self):
+        """ (rows, columns) of the source """
+        if hasattr(self.source, 'shape'):
+            return tuple(self.source.shape[:2])
+        rows = len(self.source)
+        return rows, len(self.source[0]) if rows else 0
+
+    def set_source(self, source):
+        self._commit_focus()
+        self.source = source
+        self.top = self.left = 0
+        self.refresh()
+
+    def position(self, i, j):
+        """ (row, column) of the source shown by the cell at grid row i and column j """
+        row = i if i < self.header_rows else self.header_rows + self.top + i - self.header_rows
+        column = j if j < self.header_columns else self.header_columns + self.left + j - self.header_columns
+        return row, column
+
+    def cell(self, row, column):
+        """ widget showing the source at row and column, None if not visible """
+        i = row if row < self.header_rows else row - self.top
+        j = column if column < self.header_columns else column - self.left
+        # scrolled out before the headers
+        if row >= self.header_rows > i or column >= self.header_columns > j:
+            return None
+        return self._cells.get((i, j))
+
+    def refresh(self):
+        """ show the current window of the source again, only changed cells are updated """
+        nrows, ncolumns = self.shape
+        self.top = max(0, min(self.top, nrows - self.header_rows - self.visible_rows))
+        self.left = max(0, min(self.left, ncolumns - self.header_columns - self.visible_columns))
+        script = []
+        for (i, j), cell in self._cells.items():
+            row, column = self.position(i, j)
+            text = self.formatter(self.source[row][column]) if row < nrows and column < ncolumns else ''
+            if text == self._texts[i, j]:
+                continue
+            self._texts[i, j] = text
+            if isinstance(cell, Entry):
+                script.append(tcl.command(cell._w, 'delete', 0, 'end'))
+                script.append(tcl.command(cell._w, 'insert', 0, text))
+            else:
+                script.append(tcl.command(cell._w, 'configure', text=text))
+        if script:
+            self.tk.eval('\n'.join(script))
+        self._vbar.set(*self._fractions(self.top, self.visible_rows, nrows - self.header_rows))
+        self._hbar.set(*self._fractions(self.left, self.visible_columns, ncolumns - self.header_columns))
+
+    @staticmethod
+    def _fractions(first, visible, total):
+        if total <= 0:
+            return 0.0, 1.0
+        return first / total, min(1.0, (first + visible) / total)
+
+    def scroll_to(self, row=None, column=None):
+        """ scroll so that the source row and column are the first ones shown """
+        self._commit_focus()
+        if row is not None:
+            self.top = row - self.header_rows
+        if column is not None:
+            self.left = column - self.header_columns
+        self.refresh()
+
+    def yview(self, *args):
+        self._commit_focus()
+        self.top = self._view(args, self.top, self.visible_rows, self.shape[0] - self.header_rows)
+        self.refresh()
+
+    def xview(self, *args):
+        self._commit_focus()
+        self.left = self._view(args, self.left, self.visible_columns, self.shape[1] - self.header_columns)
+        self.refresh()
+
+    @staticmethod
+    def _view(args, first, visible, total):
+        """ new first index by the arguments of a scrollbar command """
+        if args[0] == 'moveto':
+            return round(float(args[1]) * total)
+        step = visible if args[2] == 'pages' else 1
+        return first + int(args[1]) * step
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.yview('scroll', -3, 'units')
+        else:
+            self.yview('scroll', 3, 'units')
+        return 'break'
+
+    def _commit_focus(self):
+        """ commit the entry cell being edited before it shows another source cell,
+        its FocusOut comes only after the scroll
+        """
+        at = self._entries.get(str(self.tk.call('focus')))
+        if at is not None:
+            self._commit(at)
+
+    def _commit(self, at):
+        cell = self._cells[at]
+        text = cell.get()
+        if text == self._texts[at]:
+            return
+        row, column = self.position(*at)
+        if row < self.shape[0] and column < self.shape[1]:
+            self.source[row][column] = text
+            self._texts[at] = text
+        self.event_generate('<<TableEdited>>')